@@ -0,0 +1,46 @@
+# scripts/bench_guided_sentiment.py
+#
+# Reports how many generated words pass sentiment bounds with and without
+# `generate --guide-sentiment` (see sentiment.guide_patterns), along with the
+# mean per-character log-likelihood of the words under the unguided model,
+# to show they stay as corpus-like.
+#
+#   python scripts/bench_guided_sentiment.py [corpus ...]
+
+import pathlib
+import sys
+
+import numpy as np
+
+script_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(0, str(script_dir.parent / 'src'))
+
+from slithyt import generator, pattern, sentiment, utils
+
+BOUNDS = [(0.8, None), (0.7, None), (None, 0.2)]
+SAMPLES = 20_000
+
+def acceptance(model, low, high) -> tuple[float, float]:
+    words = generator.generate_batch(model, SAMPLES, 5, 10, rng=np.random.default_rng(0))
+    scores = sentiment.score_many(words)
+    ok = np.ones(len(words), dtype=bool)
+    if low is not None:
+        ok &= scores >= low
+    if high is not None:
+        ok &= scores <= high
+    return ok.mean(), words
+
+if __name__ == "__main__":
+    corpora = sys.argv[1:] or [utils.data_path(name) for name in
+                               ('latin-male-names.txt', 'drug-names.txt', 'google-10000.txt.gz', 'cmu.txt.gz')]
+    print(f"{'corpus':<24} {'bounds':<12} {'plain':>8} {'guided':>8} {'gain':>7}  log-lik plain/guided")
+    for corpus in corpora:
+        model, _ = generator.train_from_corpus(corpus, n=3, compact=True)
+        plain = generator.compile_model(model)
+        for low, high in BOUNDS:
+            guided = pattern.constrain(plain, *sentiment.guide_patterns(low, high))
+            before, plain_words = acceptance(plain, low, high)
+            after, guided_words = acceptance(guided, low, high)
+            bounds = f">= {low}" if low is not None else f"<= {high}"
+            likelihood = f"{generator.log_likelihood(plain, plain_words).mean():.2f}/{generator.log_likelihood(plain, guided_words).mean():.2f}"
+            print(f"{pathlib.Path(corpus).name:<24} {bounds:<12} {before:8.2%} {after:8.2%} {after / max(before, 1 / SAMPLES):6.0f}x  {likelihood}")
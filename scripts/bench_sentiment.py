@@ -0,0 +1,109 @@
+# scripts/bench_sentiment.py
+#
+# Benchmarks slithyt.sentiment against the linear-scan algorithm it replaced,
+# and sentiment.score_many() against a loop of analyze_word_sentiment()
+# calls, and checks that every score is identical.
+#
+#   python scripts/bench_sentiment.py [word-file ...]
+#
+# Words come from the given files (default: cmu.txt.gz plus the bundled name
+# corpora), plus generated words, which miss the VADER lexicon and so
+# exercise the affix and infix matching.
+
+import os
+import pathlib
+import random
+import sys
+import time
+
+import numpy as np
+
+script_dir = pathlib.Path(__file__).parent.resolve()
+sys.path.insert(0, str(script_dir.parent / 'src'))
+
+from slithyt import generator, sentiment, utils
+
+_SORTED_PREFIXES = sorted(sentiment._PREFIXES.keys(), key=len, reverse=True)
+_SORTED_SUFFIXES = sorted(sentiment._SUFFIXES.keys(), key=len, reverse=True)
+
+def linear_sentiment(word: str) -> float:
+    """The previous algorithm: linear affix scans and a quadratic infix loop, uncached."""
+    word_lower = word.lower()
+    if not word_lower:
+        return 0.5
+    lexicon = sentiment._word_lexicon()
+    if word_lower in lexicon:
+        return sentiment._normalize_score(lexicon[word_lower])
+    for affixes, scores, inverting, is_prefix in (
+        (_SORTED_PREFIXES, sentiment._PREFIXES, sentiment._INVERTING_PREFIXES, True),
+        (_SORTED_SUFFIXES, sentiment._SUFFIXES, sentiment._INVERTING_SUFFIXES, False),
+    ):
+        for a in affixes:
+            if len(a) >= 2 and (word_lower.startswith(a) if is_prefix else word_lower.endswith(a)):
+                stem = word_lower[len(a):] if is_prefix else word_lower[:-len(a)]
+                if len(stem) < 4:
+                    return sentiment._normalize_score(scores[a])
+                stem_sentiment = linear_sentiment(stem)
+                if stem_sentiment == 0.5:
+                    return sentiment._normalize_score(scores[a])
+                if a in inverting:
+                    return 1.0 - stem_sentiment
+                return sentiment._normalize_score((scores[a] + (stem_sentiment * 8 - 4)) / 2)
+    found_scores = []
+    i = 0
+    while i < len(word_lower):
+        best_match = ""
+        for j in range(len(word_lower), i, -1):
+            substring = word_lower[i:j]
+            if len(substring) >= 3 and substring in sentiment._INFIXES:
+                best_match = substring
+                break
+        if best_match:
+            found_scores.append(sentiment._INFIXES[best_match])
+            i += len(best_match)
+        else:
+            i += 1
+    if not found_scores:
+        return 0.5
+    return sentiment._normalize_score(sum(found_scores) / len(found_scores))
+
+def load_words(paths) -> list[str]:
+    words = []
+    for path in paths:
+        with utils.open_any(str(path)) as f:
+            words.extend(line.strip() for line in f if line.strip())
+    random.Random(0).shuffle(words)
+    return words
+
+def generate_words(count: int) -> list[str]:
+    model, _ = generator.train_from_corpus(utils.data_path('latin-male-names.txt'), n=3, compact=True)
+    return generator.generate_batch(generator.compile_model(model), count, 5, 14, rng=np.random.default_rng(1))
+
+def bench(label: str, score, items) -> list:
+    """Times ``score`` over ``items``: the words, or a single batch of them."""
+    start = time.perf_counter()
+    scores = [score(item) for item in items]
+    elapsed = time.perf_counter() - start
+    count = len(items) if isinstance(items[0], str) else len(items[0])
+    print(f"{label:<28} {elapsed:7.3f} s  {elapsed / count * 1e6:6.2f} us/word")
+    return scores
+
+if __name__ == "__main__":
+    data = pathlib.Path(utils.data_path('cmu.txt.gz')).parent
+    paths = sys.argv[1:] or [data / 'cmu.txt.gz', *sorted(data.glob('*-names.txt'))]
+    # Generated words fit in the memo, as in a generation run; the word
+    # lists are too large to, so a second pass gains nothing.
+    for label, words in (("word lists", load_words(paths)), ("generated", generate_words(50_000))):
+        print(f"{label}: {len(words)} words")
+        before = bench("  linear scan", linear_sentiment, words)
+        sentiment._analyze.cache_clear()
+        after = bench("  trie, cold memo", sentiment.analyze_word_sentiment, words)
+        again = bench("  trie, warm memo", sentiment.analyze_word_sentiment, words)
+        sentiment._analyze.cache_clear()
+        batched = bench("  score_many", lambda batch: sentiment.score_many(batch).tolist(), [words])[0]
+        if (os.cpu_count() or 1) > 1:
+            pooled = bench(f"  score_many, jobs={os.cpu_count()}",
+                           lambda batch: sentiment.score_many(batch, jobs=os.cpu_count()).tolist(), [words])[0]
+            assert pooled == batched
+        mismatches = [w for w, a, b, c, d in zip(words, before, after, again, batched) if not a == b == c == d]
+        print("  scores identical" if not mismatches else f"  {len(mismatches)} mismatches, e.g. {mismatches[:5]}")
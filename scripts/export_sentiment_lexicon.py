@@ -0,0 +1,30 @@
+# scripts/export_sentiment_lexicon.py
+#
+# Extracts VADER's word lexicon into src/slithyt/data/sentiment-lexicon.marshal,
+# the table slithyt.sentiment loads at run time, so that vaderSentiment is
+# only needed to rerun this (e.g. after upgrading it), not to use slithyt.
+
+import marshal
+import pathlib
+
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+
+# Readable by every Python slithyt supports.
+MARSHAL_VERSION = 4
+
+OUTPUT = pathlib.Path(__file__).parent.parent / 'src' / 'slithyt' / 'data' / 'sentiment-lexicon.marshal'
+
+def export_sentiment_lexicon(output_file: pathlib.Path):
+    """
+    Writes VADER's lexicon, a dict of token -> mean valence (-4.0 to 4.0),
+    as a marshalled dict with its keys sorted, so reruns are reproducible.
+    """
+    lexicon = SentimentIntensityAnalyzer().lexicon
+    table = {token: float(lexicon[token]) for token in sorted(lexicon)}
+    with open(output_file, 'wb') as f:
+        marshal.dump(table, f, MARSHAL_VERSION)
+    print(f"Wrote {len(table)} lexicon entries to '{output_file}'.")
+
+
+if __name__ == "__main__":
+    export_sentiment_lexicon(OUTPUT)
@@ -0,0 +1,108 @@
+# src/slithyt/bloom.py
+#
+# A Bloom filter: a fixed-size, probabilistic set that never forgets an
+# added word but may, at a configurable rate, claim to hold one it never saw.
+
+import hashlib
+import math
+import mmap
+import os
+import struct
+from pathlib import Path
+
+# Header of a saved filter: magic, format version, capacity, bit and hash
+# counts, items added, and the target error rate.
+MAGIC = b"SLBF"
+VERSION = 1
+_HEADER = struct.Struct("<4sIQQIQd")
+
+class BloomFilter:
+    """
+    A Bloom filter sized for ``capacity`` items at a target false-positive
+    ``error_rate``. Supports ``add`` and ``in``, like a set of strings, in a
+    bounded amount of memory.
+
+    A filter can be saved to disk and loaded back memory-mapped, so large
+    ones cost no load time and are shared between processes.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        if capacity <= 0 or not 0 < error_rate < 1:
+            raise ValueError("capacity must be positive and error_rate in (0, 1)")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+        self.path = None
+
+    def save(self, path) -> None:
+        """Writes the filter to ``path``, atomically."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, self.capacity, self.num_bits,
+                                 self.num_hashes, self.count, self.error_rate))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path) -> "BloomFilter":
+        """
+        Opens a filter written by save(), memory-mapped copy-on-write: it
+        can still be added to, without changing the file.
+        """
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+        if len(buffer) < _HEADER.size:
+            raise ValueError("not a slithyt Bloom filter")
+        magic, version, capacity, num_bits, num_hashes, count, error_rate = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION or len(buffer) != _HEADER.size + (num_bits + 7) // 8:
+            raise ValueError("not a slithyt Bloom filter, or written by another version")
+        bf = cls.__new__(cls)
+        bf.capacity, bf.error_rate, bf.count = capacity, error_rate, count
+        bf.num_bits, bf.num_hashes = num_bits, num_hashes
+        bf.bits = memoryview(buffer)[_HEADER.size:]
+        bf.path = str(path)
+        return bf
+
+    def __getstate__(self):
+        # A filter still identical to its file travels to worker processes
+        # as its path.
+        if self.path is not None:
+            return {"path": self.path}
+        return {**self.__dict__, "bits": bytearray(self.bits)}
+
+    def __setstate__(self, state):
+        if "path" in state and len(state) == 1:
+            self.__dict__.update(BloomFilter.load(state["path"]).__dict__)
+        else:
+            self.__dict__.update(state)
+
+    def _hashes(self, item: str) -> tuple[int, int]:
+        # Double hashing: k positions derived from two 64-bit hashes.
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+    def add(self, item: str) -> None:
+        self.path = None  # no longer what is on disk
+        h1, h2 = self._hashes(item)
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % self.num_bits
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        # Most absent items fail on the first probe or two.
+        h1, h2 = self._hashes(item)
+        bits, num_bits = self.bits, self.num_bits
+        for i in range(self.num_hashes):
+            position = (h1 + i * h2) % num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+    def __len__(self) -> int:
+        return self.count
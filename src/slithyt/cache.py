@@ -0,0 +1,482 @@
+"""slithyt.cache — a persistent on-disk cache of trained corpus models.
+
+Training a model means reading and counting every n-gram in a corpus, which
+dominates the run time of ``slithyt generate`` on large corpora. Trained
+models are pickled under ``~/.slithyt/data/models/`` (next to the rhyming
+models that ``build-cache`` writes) and keyed by the corpus content digest,
+the n-gram order and ``FORMAT_VERSION``, so an edited corpus or a changed
+model format simply misses the cache. Cache problems are never fatal: an
+unreadable entry is retrained and an unwritable cache dir is skipped.
+
+Beneath the per-order models sits one ``ngrams.NgramTrie`` per corpus,
+holding the counts of every order up to ``ngrams.DEFAULT_MAX_ORDER``. A
+model for a new order or smoothing is derived from it without reading the
+corpus again. ``apply_delta`` edits a corpus and updates its cached trie to
+match, rather than counting the edited corpus from scratch.
+
+Dictionaries and blocklists are cached the same way, as memory-mapped
+``wordindex.WordIndex`` files, so checking words against them never means
+loading a whole word list into a set, optionally screened by a cached
+Bloom filter. Blocklists used for substring matching are cached as
+compiled ``substrings.SubstringMatcher`` automatons, and word lists
+searched by edit distance or by sound as ``neighbors.EditIndex`` and
+``phonetic.SoundIndex`` files. The ``generator.WordTrie`` that steers
+generation off dictionary and corpus words is cached per word lists,
+alphabet and length window.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import os
+import pickle
+import sys
+import time
+from pathlib import Path
+
+from . import bloom, generator, neighbors, ngrams, phonetic, substrings, utils, wordindex
+
+# Bump whenever the pickled model layout changes; older entries are then
+# ignored and removed by ``prune``.
+FORMAT_VERSION = 2
+
+MODEL_PREFIX = "corpus-"
+TRIE_PREFIX = "trie-"
+INDEX_PREFIX = "words-"
+FILTER_PREFIX = "filter-"
+SUBSTRINGS_PREFIX = "substrings-"
+EDITS_PREFIX = "edits-"
+SOUNDS_PREFIX = "sounds-"
+AVOID_PREFIX = "avoid-"
+DEFAULT_MAX_AGE_DAYS = 30
+
+
+def cache_dir() -> Path:
+    """Return the root of slithyt's data cache (``~/.slithyt/data``)."""
+    return Path.home() / ".slithyt" / "data"
+
+
+def corpus_digest(corpus_path: str) -> str:
+    """Return the SHA-256 hex digest of a corpus file's bytes."""
+    digest = hashlib.sha256()
+    with open(corpus_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def model_path(digest: str, n: int, root: Path | None = None, backoff: bool = False) -> Path:
+    root = root if root is not None else cache_dir()
+    kind = "-backoff" if backoff else ""
+    return root / "models" / f"{MODEL_PREFIX}{digest[:32]}-n{n}{kind}-v{FORMAT_VERSION}.pkl"
+
+
+def trie_path(digest: str, max_order: int, root: Path | None = None) -> Path:
+    root = root if root is not None else cache_dir()
+    return root / "models" / f"{TRIE_PREFIX}{digest[:32]}-o{max_order}-v{FORMAT_VERSION}.pkl"
+
+
+def index_path(digest: str, root: Path | None = None) -> Path:
+    root = root if root is not None else cache_dir()
+    return root / "models" / f"{INDEX_PREFIX}{digest[:32]}-v{wordindex.VERSION}.idx"
+
+
+def filter_path(digest: str, error_rate: float, root: Path | None = None) -> Path:
+    root = root if root is not None else cache_dir()
+    return root / "models" / f"{FILTER_PREFIX}{digest[:32]}-p{error_rate:g}-v{bloom.VERSION}.bloom"
+
+
+def load_word_index(
+    file_path: str,
+    *,
+    filter_error_rate: float | None = None,
+    root: Path | None = None,
+) -> wordindex.WordIndex | wordindex.FilteredIndex | set:
+    """Return a word list (one word per line, optionally gzipped) as a
+    memory-mapped ``wordindex.WordIndex``, built on first use and cached by
+    content digest. Words are lowercased, as by ``validator.load_word_set``.
+
+    With ``filter_error_rate``, the index is screened by a Bloom filter with
+    that false-positive rate (see ``wordindex.FilteredIndex``), itself
+    cached and memory-mapped. Falls back to in-memory structures if the
+    cache dir is unwritable, and to an empty set (with a warning) if the
+    file does not exist."""
+    if not file_path:
+        return set()
+    try:
+        digest = corpus_digest(file_path)
+    except FileNotFoundError:
+        print(f"WARNING: File not found at {file_path}. Skipping this check.")
+        return set()
+    path = index_path(digest, root)
+    screen = None
+    try:
+        index = wordindex.WordIndex.open(path)
+    except (OSError, ValueError):
+        # Streamed into the index (and filter) without a set of every word.
+        try:
+            with utils.open_any(file_path) as f:
+                screen = wordindex.write((line.strip().lower() for line in f if line.strip()), path,
+                                         filter_error_rate=filter_error_rate)
+            index = wordindex.WordIndex.open(path)
+        except OSError:
+            screen = None
+            index = wordindex.WordIndex.from_words(_read_words([file_path]))
+    if filter_error_rate is None:
+        return index
+
+    path = filter_path(digest, filter_error_rate, root)
+    if screen is None:
+        try:
+            screen = bloom.BloomFilter.load(path)
+        except (OSError, ValueError):
+            screen = bloom.BloomFilter(max(len(index), 1), filter_error_rate)
+            for word in index:
+                screen.add(word)
+    if screen.path is None:
+        try:
+            screen.save(path)
+            screen = bloom.BloomFilter.load(path)
+        except OSError:
+            pass
+    return wordindex.FilteredIndex(screen, index)
+
+
+def load_substring_matcher(
+    file_path: str,
+    min_len: int = substrings.DEFAULT_MIN_LEN,
+    *,
+    root: Path | None = None,
+) -> substrings.SubstringMatcher | None:
+    """Return the Aho-Corasick automaton of a blocklist's entries of at
+    least ``min_len`` characters, compiled on first use and cached by
+    content digest. Returns None (with a warning) if the file does not
+    exist."""
+    try:
+        digest = corpus_digest(file_path)
+    except FileNotFoundError:
+        print(f"WARNING: File not found at {file_path}. Skipping this check.")
+        return None
+    path = root if root is not None else cache_dir()
+    path = path / "models" / f"{SUBSTRINGS_PREFIX}{digest[:32]}-m{min_len}-v{FORMAT_VERSION}.pkl"
+    matcher = _read(path)
+    if not isinstance(matcher, substrings.SubstringMatcher):
+        with utils.open_any(file_path) as f:
+            matcher = substrings.SubstringMatcher.build(f, min_len)
+        _write(path, matcher)
+    return matcher
+
+
+def _combined_digest(file_paths: list[str]) -> tuple[list[str], str]:
+    """The existing files among ``file_paths`` (warning about the others)
+    and one digest of their contents, whatever their order."""
+    digests = {}
+    for file_path in dict.fromkeys(file_paths):
+        try:
+            digests[file_path] = corpus_digest(file_path)
+        except FileNotFoundError:
+            print(f"WARNING: File not found at {file_path}. Skipping this check.")
+    return list(digests), hashlib.sha256("\n".join(sorted(digests.values())).encode()).hexdigest()
+
+
+def _read_words(file_paths: list[str]) -> set[str]:
+    words = set()
+    for file_path in file_paths:
+        with utils.open_any(file_path) as f:
+            words.update(line.strip().lower() for line in f if line.strip())
+    return words
+
+
+def load_edit_index(
+    file_paths: list[str],
+    max_distance: int,
+    *,
+    root: Path | None = None,
+) -> neighbors.EditIndex:
+    """Return a memory-mapped ``neighbors.EditIndex`` of every word in the
+    given word lists (dictionary, corpus, blocklist...), built on first use
+    and cached by their combined content digest. Missing files are skipped
+    with a warning."""
+    file_paths, combined = _combined_digest(file_paths)
+    root = root if root is not None else cache_dir()
+    path = root / "models" / f"{EDITS_PREFIX}{combined[:32]}-d{max_distance}-v{neighbors.VERSION}.idx"
+    try:
+        return neighbors.EditIndex.open(path)
+    except (OSError, ValueError):
+        pass
+    print(f"INFO: Indexing words for edit distance {max_distance} (once per word list)...", file=sys.stderr)
+    words = _read_words(file_paths)
+    try:
+        neighbors.write(words, max_distance, path)
+        return neighbors.EditIndex.open(path)
+    except OSError:
+        return neighbors.EditIndex.from_words(words, max_distance)
+
+
+def load_sound_index(
+    file_paths: list[str],
+    *,
+    root: Path | None = None,
+) -> phonetic.SoundIndex:
+    """Return a ``phonetic.SoundIndex`` of the sound keys of every word in
+    the given word lists, built on first use and cached by their combined
+    content digest. Missing files are skipped with a warning."""
+    file_paths, combined = _combined_digest(file_paths)
+    root = root if root is not None else cache_dir()
+    path = root / "models" / f"{SOUNDS_PREFIX}{combined[:32]}-v{phonetic.VERSION}.idx"
+    try:
+        return phonetic.SoundIndex.open(path)
+    except (OSError, ValueError):
+        pass
+    words = _read_words(file_paths)
+    try:
+        phonetic.write(words, path)
+        return phonetic.SoundIndex.open(path)
+    except OSError:
+        return phonetic.SoundIndex.from_words(words)
+
+
+def load_word_trie(
+    file_paths: list[str],
+    alphabet: str,
+    min_len: int = 0,
+    max_len: int | None = None,
+    *,
+    root: Path | None = None,
+) -> generator.WordTrie:
+    """Return the ``generator.WordTrie`` that steers generation away from
+    every word in the given word lists (dictionary, corpora), built on
+    first use and cached by their combined content digest, the model's
+    alphabet and the length window. Missing files are skipped with a
+    warning."""
+    file_paths, combined = _combined_digest(file_paths)
+    shape = hashlib.sha256(f"{alphabet}\0{min_len}\0{max_len}".encode()).hexdigest()
+    root = root if root is not None else cache_dir()
+    path = root / "models" / f"{AVOID_PREFIX}{combined[:32]}-{shape[:16]}-v{FORMAT_VERSION}.pkl"
+    trie = _read(path)
+    if not isinstance(trie, generator.WordTrie):
+        trie = generator.WordTrie.build(alphabet, _read_words(file_paths), min_len, max_len)
+        _write(path, trie)
+    return trie
+
+
+def _train(corpus_path: str, n: int, backoff: bool):
+    if backoff:
+        return generator.train_backoff(corpus_path, n=n)
+    return generator.train_from_corpus(corpus_path, n=n, compact=True)
+
+
+def _read(path: Path):
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        os.utime(path)  # mark as recently used, for pruning
+        return entry
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def _write(path: Path, entry) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # a missing cache entry just means we retrain next time
+
+
+def load_trie(
+    corpus_path: str,
+    max_order: int = ngrams.DEFAULT_MAX_ORDER,
+    *,
+    use_cache: bool = True,
+    root: Path | None = None,
+    digest: str | None = None,
+) -> ngrams.NgramTrie:
+    """Return the ``ngrams.NgramTrie`` of a corpus up to ``max_order``,
+    counting the corpus only when no trie for its content is cached.
+    A corpus with too many distinct characters for ``max_order`` is
+    counted up to the highest order its alphabet allows instead, so check
+    the trie's ``max_order``. Raises OSError if the corpus cannot be read."""
+    if not use_cache:
+        return _count_trie(corpus_path, max_order)
+    digest = digest if digest is not None else corpus_digest(corpus_path)
+    path = trie_path(digest, max_order, root)
+    trie = _read(path)
+    if trie is None:
+        trie = _count_trie(corpus_path, max_order)
+        _write(path, trie)
+    return trie
+
+
+def _count_trie(corpus_path: str, max_order: int) -> ngrams.NgramTrie:
+    try:
+        return ngrams.NgramTrie.from_corpus(corpus_path, max_order)
+    except ngrams.AlphabetTooLarge as e:
+        return ngrams.NgramTrie.from_corpus(corpus_path, e.max_order)
+
+
+def read_delta(lines) -> tuple[list[str], list[str]]:
+    """Parse a corpus delta into ``(added, removed)`` words.
+
+    Each line is ``+word`` (add), ``-word`` (remove) or a bare word (add);
+    blank lines and ``#`` comments are skipped."""
+    added, removed = [], []
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line[0] == "-":
+            removed.append(line[1:].strip().lower())
+        else:
+            added.append(line.removeprefix("+").strip().lower())
+    return [w for w in added if w], [w for w in removed if w]
+
+
+def apply_delta(
+    corpus_path: str,
+    added: list[str],
+    removed: list[str],
+    *,
+    output_path: str | None = None,
+    max_order: int = ngrams.DEFAULT_MAX_ORDER,
+    root: Path | None = None,
+) -> tuple[ngrams.NgramTrie, int]:
+    """Remove and then add corpus words without retraining.
+
+    Lines holding a removed word are dropped from the corpus and added words
+    are appended, writing the result to ``output_path`` (the corpus itself
+    by default; gzipped if the name ends in ``.gz``). The corpus's cached
+    trie is updated by the same delta and stored under the new content's
+    digest and the requested ``max_order``, as ``load_trie`` looks it up
+    even when a large alphabet left it with fewer orders, so the next run
+    on the edited corpus is a cache hit. Returns the updated trie and how
+    many distinct words were actually removed (removing a word the corpus
+    lacks does nothing). Raises OSError if the corpus cannot be read or
+    written."""
+    output_path = output_path if output_path is not None else corpus_path
+    trie = load_trie(corpus_path, max_order, root=root)
+    gone = {word for word in removed if word in trie.word_counts}
+    removed_count = trie.remove_words(gone)
+    trie.add_words(added)
+
+    target = Path(output_path)
+    tmp = target.with_name(f"{target.name}.{os.getpid()}.tmp")
+    opener = gzip.open if target.suffix == ".gz" else open
+    with utils.open_any(corpus_path) as src, opener(tmp, "wt", encoding="utf-8") as dst:
+        for line in src:
+            if line.strip().lower() not in gone:
+                dst.write(line if line.endswith("\n") else line + "\n")
+        for word in added:
+            dst.write(word + "\n")
+    os.replace(tmp, target)
+    _write(trie_path(corpus_digest(output_path), max_order, root), trie)
+    return trie, removed_count
+
+
+def load_or_train(
+    corpus_path: str,
+    n: int = 3,
+    *,
+    backoff: bool = False,
+    use_cache: bool = True,
+    root: Path | None = None,
+) -> tuple[generator.CompactModel | dict, set]:
+    """Return ``(model, corpus_word_set)`` for a corpus, as
+    ``generator.train_from_corpus(corpus_path, n, compact=True)`` (or
+    ``generator.train_backoff`` with ``backoff=True``) would, reusing a
+    cached model when the corpus content and ``n`` are unchanged, or else
+    deriving it from the corpus's cached trie. With ``use_cache=False`` the
+    corpus is always retrained and the cache is left untouched."""
+    if not use_cache:
+        return _train(corpus_path, n, backoff)
+    try:
+        digest = corpus_digest(corpus_path)
+        path = model_path(digest, n, root, backoff)
+    except OSError:
+        return _train(corpus_path, n, backoff)
+
+    entry = _read(path)
+    if entry is not None:
+        return entry
+    trie = load_trie(corpus_path, max(n, ngrams.DEFAULT_MAX_ORDER), root=root, digest=digest)
+    if trie.max_order < n:
+        # Too many distinct characters to index order n; train directly.
+        return _train(corpus_path, n, backoff)
+    model, corpus_word_set = trie.model(n, backoff), trie.corpus_word_set
+    if model:
+        _write(path, (model, corpus_word_set))
+    return model, corpus_word_set
+
+
+def load_blend(
+    corpora: list[tuple[str, float]],
+    n: int = 3,
+    *,
+    backoff: bool = False,
+    use_cache: bool = True,
+    root: Path | None = None,
+) -> tuple[generator.CompactModel | dict, set]:
+    """Return ``(model, corpus_word_set)`` for a weighted blend of corpora
+    (see ``ngrams.NgramTrie.blend``), given ``(path, weight)`` pairs.
+
+    Each corpus is counted once and cached as a trie, as with
+    ``load_or_train``, so a blend with new weights only re-merges cached
+    counts."""
+    max_order = max(n, ngrams.DEFAULT_MAX_ORDER) if use_cache else max(n, 2)
+    tries = []
+    for corpus_path, weight in corpora:
+        try:
+            tries.append((load_trie(corpus_path, max_order, use_cache=use_cache, root=root), weight))
+        except FileNotFoundError:
+            print(f"ERROR: Corpus file not found at {corpus_path}")
+            return {}, set()
+    blended = ngrams.NgramTrie.blend(tries)
+    if blended.max_order < n:
+        print(f"ERROR: The blended corpora have too many distinct characters for order {n} (at most order {blended.max_order}).")
+        return {}, set()
+    return blended.model(n, backoff), blended.corpus_word_set
+
+
+def prune(
+    *,
+    max_age_days: float | None = DEFAULT_MAX_AGE_DAYS,
+    everything: bool = False,
+    root: Path | None = None,
+    now: float | None = None,
+) -> list[Path]:
+    """Delete cached corpus models, tries, word indexes, filters, substring
+    automatons, edit and sound indexes and steering tries and return the
+    paths removed.
+
+    Entries written by another ``FORMAT_VERSION`` are always removed, as are
+    entries not used for ``max_age_days`` (``None`` keeps them regardless of
+    age). ``everything=True`` removes every cached model."""
+    root = root if root is not None else cache_dir()
+    now = now if now is not None else time.time()
+    current = {
+        MODEL_PREFIX: f"-v{FORMAT_VERSION}.pkl",
+        TRIE_PREFIX: f"-v{FORMAT_VERSION}.pkl",
+        INDEX_PREFIX: f"-v{wordindex.VERSION}.idx",
+        FILTER_PREFIX: f"-v{bloom.VERSION}.bloom",
+        SUBSTRINGS_PREFIX: f"-v{FORMAT_VERSION}.pkl",
+        EDITS_PREFIX: f"-v{neighbors.VERSION}.idx",
+        SOUNDS_PREFIX: f"-v{phonetic.VERSION}.idx",
+        AVOID_PREFIX: f"-v{FORMAT_VERSION}.pkl",
+    }
+    entries = [(path, suffix) for prefix, suffix in current.items() for path in (root / "models").glob(f"{prefix}*")]
+    removed = []
+    for path, suffix in sorted(entries):
+        try:
+            stale = everything or not path.name.endswith(suffix)
+            if not stale and max_age_days is not None:
+                stale = now - path.stat().st_mtime > max_age_days * 24 * 60 * 60
+            if stale:
+                path.unlink()
+                removed.append(path)
+        except OSError:
+            continue
+    return removed
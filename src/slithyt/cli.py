@@ -1,11 +1,97 @@
 # src/slithyt/cli.py
 
 import argparse
-import pathlib
+import contextlib
+import csv
+import itertools
+import json
+import os
 import pickle
-from . import generator, validator, sentiment, pronounce, rhyme, build, utils, update
+import re
+import sys
+import time
+# The NumPy-backed modules (cache, generator, parallel, ...) are imported by
+# the commands that use them, so that light commands start quickly.
+from . import substrings, validator, sentiment, pronounce, rhyme, build, utils, update
 from . import __version__
 
+# Words buffered per write in --stream mode, and the longest a word waits
+# in the buffer while words are scarce.
+STREAM_BATCH = 4096
+STREAM_FLUSH_SECONDS = 0.25
+# Consecutive chunks of candidates without a new word after which generation
+# gives up: the model has (nearly) run out of novel words.
+GENERATE_PATIENCE = 2000
+
+def _emit(chunks, stream: bool) -> int:
+    """Writes generated words, given as lists per chunk, to stdout: decorated
+    for reading, or plain and batched into large writes for piping into
+    other tools. Returns how many words were written, or None if the reader
+    went away first."""
+    written = 0
+    if not stream:
+        for words in chunks:
+            for word in words:
+                print(f"  - {word}")
+            written += len(words)
+        return written
+    batch = []
+    last_flush = time.monotonic()
+    try:
+        # Checked after every chunk, even an empty one, so that words go out
+        # promptly and a closed pipe is noticed while generation stalls.
+        for words in chunks:
+            batch.extend(words)
+            if batch and (len(batch) >= STREAM_BATCH or time.monotonic() - last_flush >= STREAM_FLUSH_SECONDS):
+                sys.stdout.write("\n".join(batch) + "\n")
+                sys.stdout.flush()
+                written += len(batch)
+                batch.clear()
+                last_flush = time.monotonic()
+        if batch:
+            sys.stdout.write("\n".join(batch) + "\n")
+            written += len(batch)
+        sys.stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. `| head`); stop quietly.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return None
+    return written
+
+def _emit_records(records, fmt: str) -> None:
+    """Writes --input validation records to stdout as JSON lines or CSV."""
+    try:
+        if fmt == "csv":
+            writer = csv.DictWriter(sys.stdout, ["word", "valid", "sentiment", "pronounceability"], lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            for record in records:
+                sys.stdout.write(json.dumps(record) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+
+def _read_input(path: str):
+    """Yields the non-blank lines of a file (or stdin for ``-``), stripped."""
+    with (contextlib.nullcontext(sys.stdin) if path == "-" else utils.open_any(path)) as f:
+        for line in f:
+            if line := line.strip():
+                yield line
+
+def _corpus_spec(value: str) -> tuple[str, float]:
+    """Parses a --corpus value, ``path`` or ``path:weight``, into (path, weight)."""
+    path, sep, weight = value.rpartition(":")
+    if sep:
+        try:
+            weight = float(weight)
+        except ValueError:
+            return value, 1.0  # a path that happens to contain ':'
+        if weight <= 0:
+            raise argparse.ArgumentTypeError(f"corpus weight must be positive: {value}")
+        return path, weight
+    return value, 1.0
+
 def main():
     """Main function for the command-line interface."""
     parser = argparse.ArgumentParser(description="SlithyT: A plausible word generation tool.")
@@ -18,27 +104,55 @@ def main():
 
     # --- Generate command ---
     gen_parser = subparsers.add_parser("generate", help="Generate new words.")
-    gen_parser.add_argument("--corpus", help="Path to the corpus file for training. Required unless using --rhymes-with.")
+    gen_parser.add_argument(
+        "--corpus", action="append", type=_corpus_spec, metavar="PATH[:WEIGHT]",
+        help="Corpus file to train on. Required unless using --rhymes-with. Repeat to blend corpora by weight, e.g. a.txt:0.7 b.txt:0.3.",
+    )
     # ... (all other generate arguments)
-    gen_parser.add_argument("--count", type=int, default=10)
+    gen_parser.add_argument("--count", type=int, default=10, help="How many words to generate; 0 streams without end (implies --stream).")
+    gen_parser.add_argument("--stream", action="store_true", help="Write plain words, one per line, with progress messages on stderr.")
+    gen_parser.add_argument("--dedup", choices=["set", "bloom"], default="set", help="Dedup with an exact set, or a fixed-size Bloom filter for very long streams.")
+    gen_parser.add_argument("--bloom-capacity", type=int, default=10_000_000, help="Words the --dedup bloom filter is sized for.")
+    gen_parser.add_argument("--bloom-error-rate", type=float, default=0.001, help="False-positive rate of the --dedup bloom filter.")
     gen_parser.add_argument("--min-len", type=int, default=5)
     gen_parser.add_argument("--max-len", type=int, default=10)
     gen_parser.add_argument("--matches-regex")
     gen_parser.add_argument("--reject-regex")
     gen_parser.add_argument("--dictionary")
     gen_parser.add_argument("--blocklist")
+    gen_parser.add_argument("--block-substrings", action="store_true", help="Also reject words that contain a blocklist entry.")
+    gen_parser.add_argument("--substring-min-len", type=int, default=substrings.DEFAULT_MIN_LEN, help="Shortest blocklist entry matched by --block-substrings.")
+    gen_parser.add_argument("--min-edit-distance", type=int, metavar="K", help="Reject words fewer than K edits away from a dictionary, corpus or blocklist word.")
+    gen_parser.add_argument("--reject-homophones", action="store_true", help="Reject words that sound like a dictionary or blocklist word.")
+    gen_parser.add_argument("--filter-error-rate", type=float, help="Screen --dictionary/--blocklist lookups with a Bloom filter of this false-positive rate (for huge lists).")
     gen_parser.add_argument("--ngram-size", type=int, default=3)
+    gen_parser.add_argument("--backoff", action="store_true", help="Interpolate from --ngram-size down to bigrams, so large sizes stay creative.")
     gen_parser.add_argument("--min-sentiment", type=float)
     gen_parser.add_argument("--max-sentiment", type=float)
+    gen_parser.add_argument("--guide-sentiment", action="store_true", help="Steer generation toward morphemes that score within --min-sentiment/--max-sentiment, instead of only filtering.")
     gen_parser.add_argument("--min-pronounceability", type=float)
     gen_parser.add_argument("--rhymes-with")
     gen_parser.add_argument("--allow-corpus-words", action="store_true")
+    gen_parser.add_argument("--jobs", type=int, default=1, help="Worker processes to generate with (0 = one per CPU).")
+    gen_parser.add_argument("--seed", type=int, help="Seed for reproducible output, regardless of --jobs.")
+    gen_parser.add_argument("--enumerate", action="store_true", help="List the most probable words in order instead of sampling (0 --count lists them all).")
+    gen_parser.add_argument("--rank", action="store_true", help="Oversample a pool of words and keep the --count most corpus-like.")
+    gen_parser.add_argument("--pool", type=int, help="Candidates to rank with --rank (default 10x --count).")
+    gen_parser.add_argument("--no-cache", action="store_true", help="Retrain the corpus model instead of using the on-disk cache.")
 
     # --- Validate command ---
-    val_parser = subparsers.add_parser("validate", help="Validate a potential word.")
-    val_parser.add_argument("word")
+    val_parser = subparsers.add_parser("validate", help="Validate a potential word, or a list of them.")
+    val_parser.add_argument("word", nargs="?")
+    val_parser.add_argument("--input", metavar="FILE", help="Validate every word in FILE (one per line, optionally gzipped; - for stdin) instead.")
+    val_parser.add_argument("--format", choices=["jsonl", "csv"], default="jsonl", help="Output format for --input.")
+    val_parser.add_argument("--jobs", type=int, default=0, help="Worker processes to score a long --input with (0 = one per CPU).")
     val_parser.add_argument("--dictionary")
     val_parser.add_argument("--blocklist")
+    val_parser.add_argument("--block-substrings", action="store_true", help="Also reject words that contain a blocklist entry.")
+    val_parser.add_argument("--substring-min-len", type=int, default=substrings.DEFAULT_MIN_LEN, help="Shortest blocklist entry matched by --block-substrings.")
+    val_parser.add_argument("--min-edit-distance", type=int, metavar="K", help="Reject words fewer than K edits away from a dictionary, corpus or blocklist word.")
+    val_parser.add_argument("--reject-homophones", action="store_true", help="Reject words that sound like a dictionary or blocklist word.")
+    val_parser.add_argument("--filter-error-rate", type=float, help="Screen --dictionary/--blocklist lookups with a Bloom filter of this false-positive rate (for huge lists).")
 
     # --- Rhyme command ---
     rhyme_parser = subparsers.add_parser("rhyme", help="Get phonetic info for a word.")
@@ -48,6 +162,20 @@ def main():
     build_parser = subparsers.add_parser("build-cache", help="Build the phonetic and transcription models.")
     build_parser.add_argument("--corpus", help="Path to a custom corpus to build models from.")
 
+    # --- Cache Prune command ---
+    prune_parser = subparsers.add_parser("cache-prune", help="Remove cached corpus models.")
+    prune_parser.add_argument(
+        "--older-than", type=float, metavar="DAYS",
+        help="Remove models unused for this many days (default 30).",
+    )
+    prune_parser.add_argument("--all", action="store_true", help="Remove every cached corpus model.")
+
+    # --- Apply Delta command ---
+    delta_parser = subparsers.add_parser("apply-delta", help="Add or remove corpus words, updating the cached model instead of retraining.")
+    delta_parser.add_argument("--corpus", required=True, help="The corpus file to edit.")
+    delta_parser.add_argument("--delta", required=True, help="File of '+word' / '-word' lines (bare words are added), or '-' for stdin.")
+    delta_parser.add_argument("--output", help="Write the edited corpus here instead of over --corpus.")
+
     # --- Update command ---
     update_parser = subparsers.add_parser("update", help="Update slithyt to the latest published version.")
     update_parser.add_argument("--check", action="store_true", help="Only report whether an update is available.")
@@ -75,12 +203,40 @@ def main():
     # --- Argument Validation ---
     if args.command == "generate" and not args.corpus and not args.rhymes_with:
         parser.error("--corpus is required unless --rhymes-with is used.")
+    if args.command == "generate" and args.rank and (args.rhymes_with or args.count <= 0):
+        parser.error("--rank needs --corpus and a positive --count.")
+    if args.command in ("generate", "validate") and args.filter_error_rate is not None and not 0 < args.filter_error_rate < 1:
+        parser.error("--filter-error-rate must be between 0 and 1.")
+    if args.command == "generate" and args.enumerate and (args.rhymes_with or args.rank):
+        parser.error("--enumerate needs --corpus and cannot be combined with --rank.")
 
     # --- Command Execution ---
+    if args.command == "cache-prune":
+        from . import cache
+        max_age_days = args.older_than if args.older_than is not None else cache.DEFAULT_MAX_AGE_DAYS
+        removed = cache.prune(max_age_days=max_age_days, everything=args.all)
+        print(f"Removed {len(removed)} cached model(s) from {cache.cache_dir() / 'models'}")
+        return
+
+    if args.command == "apply-delta":
+        from . import cache, ngrams
+        try:
+            if args.delta == "-":
+                added, removed = cache.read_delta(sys.stdin)
+            else:
+                with utils.open_any(args.delta) as f:
+                    added, removed = cache.read_delta(f)
+            trie, removed_count = cache.apply_delta(args.corpus, added, removed, output_path=args.output)
+        except (OSError, ngrams.AlphabetTooLarge) as e:
+            parser.exit(1, f"ERROR: {e}\n")
+        print(f"Applied {len(added)} addition(s) and {removed_count} removal(s); the corpus now has {len(trie.word_counts)} distinct words.")
+        return
+
     if args.command == "build-cache":
+        from . import cache
         corpus_to_use = args.corpus if args.corpus else utils.data_path('cmu.txt.gz')
         
-        cache_dir = pathlib.Path.home() / '.slithyt' / 'data'
+        cache_dir = cache.cache_dir()
         cache_dir.mkdir(parents=True, exist_ok=True)
         
         phonetic_model = build.build_phonetic_model(corpus_to_use)
@@ -94,19 +250,40 @@ def main():
         print(f"Transcription model saved to {cache_dir / 'transcription-model.dat'}")
         return
 
+    if args.command == "validate" and (args.word is None) == (args.input is None):
+        parser.error("validate needs either a word or --input")
+
     if args.command == "generate" or args.command == "validate":
+        from . import cache
         default_dict_path = utils.data_path('cmu.txt.gz')
         default_block_path = utils.data_path('en-block.txt.gz')
         block_to_load = args.blocklist if args.blocklist is not None else default_block_path
-        blocklist_set = validator.load_word_set(str(block_to_load))
+        blocklist_set = cache.load_word_index(str(block_to_load), filter_error_rate=args.filter_error_rate)
+        blocked_substrings = None
+        if args.block_substrings:
+            blocked_substrings = cache.load_substring_matcher(str(block_to_load), args.substring_min_len)
         dictionary_set = set()
         dict_to_load = args.dictionary if args.dictionary is not None else default_dict_path
-        if not (args.command == "generate" and hasattr(args, 'corpus') and args.corpus and str(dict_to_load) == args.corpus):
-            dictionary_set = validator.load_word_set(str(dict_to_load))
+        if not (args.command == "generate" and hasattr(args, 'corpus') and args.corpus and str(dict_to_load) in [path for path, _ in args.corpus]):
+            dictionary_set = cache.load_word_index(str(dict_to_load), filter_error_rate=args.filter_error_rate)
+        neighbor_index = None
+        if args.min_edit_distance is not None and args.min_edit_distance > 1:
+            word_lists = [str(dict_to_load), str(block_to_load)]
+            if args.command == "generate" and args.corpus and not args.allow_corpus_words:
+                word_lists += [path for path, _ in args.corpus]
+            neighbor_index = cache.load_edit_index(word_lists, args.min_edit_distance - 1)
+        homophone_index = None
+        if args.reject_homophones:
+            homophone_index = cache.load_sound_index([str(dict_to_load), str(block_to_load)])
 
     if args.command == "generate":
+        from . import bloom, generator, parallel, pattern
+        stream = args.stream or args.count == 0
+        count = args.count if args.count > 0 else None
+        # Keep stdout clean for the words when streaming into a pipeline.
+        log = sys.stderr if stream else sys.stdout
         if args.rhymes_with:
-            cache_dir = pathlib.Path.home() / '.slithyt' / 'data'
+            cache_dir = cache.cache_dir()
             phonetic_model_path = cache_dir / 'phonetic-model.dat'
             transcription_model_path = cache_dir / 'transcription-model.dat'
             phonetic_model = rhyme.load_phonetic_model(str(phonetic_model_path))
@@ -115,52 +292,124 @@ def main():
             
             target_phonemes = rhyme.get_phonetic_breakdown(args.rhymes_with)
             if not target_phonemes:
-                print(f"ERROR: Cannot find '{args.rhymes_with}' in phonetic dictionary.")
+                print(f"ERROR: Cannot find '{args.rhymes_with}' in phonetic dictionary.", file=log)
                 return
             signature = rhyme.get_rhyme_signature(target_phonemes)
             if not signature:
-                print(f"ERROR: Cannot find a valid rhyme signature for '{args.rhymes_with}'.")
+                print(f"ERROR: Cannot find a valid rhyme signature for '{args.rhymes_with}'.", file=log)
                 return
             
-            print(f"INFO: Generating words that rhyme with '{args.rhymes_with}'...")
-            generated_words = []
-            for _ in range(args.count * 200):
-                if len(generated_words) >= args.count: break
-                new_phonemes = rhyme.generate_phonetic_word(phonetic_model, signature)
-                if not new_phonemes: continue
-                word = rhyme.transcribe_word(transcription_model, new_phonemes)
-                if word and word not in generated_words and validator.validate_word(
-                    word, args.matches_regex, args.reject_regex, dictionary_set, blocklist_set,
-                    None, args.min_sentiment, args.max_sentiment, args.min_pronounceability
-                ):
-                    generated_words.append(word)
-                    print(f"  - {word}")
+            print(f"INFO: Generating words that rhyme with '{args.rhymes_with}'...", file=log)
+            job = parallel.RhymeJob(phonetic_model, transcription_model, signature)
+            # Rhymes are not held to the --min-len/--max-len window.
+            length_window = (0, None)
+            corpus_rejection_set = None
+            max_candidates = count * 200 if count else None
         else:
-            print(f"INFO: Training model from '{args.corpus}'...")
-            model, corpus_set = generator.train_from_corpus(args.corpus, n=args.ngram_size)
+            if len(args.corpus) == 1:
+                print(f"INFO: Training model from '{args.corpus[0][0]}'...", file=log)
+                model, corpus_set = cache.load_or_train(args.corpus[0][0], n=args.ngram_size, backoff=args.backoff, use_cache=not args.no_cache)
+            else:
+                total = sum(weight for _, weight in args.corpus)
+                sources = ", ".join(f"'{path}' ({weight / total:.0%})" for path, weight in args.corpus)
+                print(f"INFO: Training blended model from {sources}...", file=log)
+                model, corpus_set = cache.load_blend(args.corpus, n=args.ngram_size, backoff=args.backoff, use_cache=not args.no_cache)
             if not model: return
             corpus_rejection_set = None if args.allow_corpus_words else corpus_set
+            length_window = (args.min_len, args.max_len)
+            
+            compiled = scorer = generator.compile_model(model)
+            if args.matches_regex or args.reject_regex:
+                try:
+                    constrained = pattern.constrain(compiled, args.matches_regex, args.reject_regex)
+                except re.error as e:
+                    parser.error(f"invalid regex: {e}")
+                if constrained is None:
+                    print("INFO: Regex is outside the subset that can steer generation; filtering candidates instead.", file=log)
+                else:
+                    compiled = constrained
+            if args.guide_sentiment:
+                patterns = sentiment.guide_patterns(args.min_sentiment, args.max_sentiment)
+                if patterns is None:
+                    print("INFO: --guide-sentiment needs --min-sentiment above 0.5 or --max-sentiment below it, within reach of some morpheme; generating without guidance.", file=log)
+                else:
+                    guided = pattern.constrain(compiled, *patterns)
+                    if guided is None:
+                        print("INFO: The sentiment patterns are outside the subset that can steer generation; filtering candidates by score instead.", file=log)
+                    else:
+                        compiled = guided
             
-            print(f"INFO: Generating {args.count} words...")
-            generated_words = []
-            for _ in range(args.count * 100):
-                if len(generated_words) >= args.count: break
-                word = generator.generate_word(model, args.min_len, args.max_len, n=args.ngram_size)
-                if word and word not in generated_words and validator.validate_word(
-                    word, args.matches_regex, args.reject_regex, dictionary_set, blocklist_set,
-                    corpus_rejection_set, args.min_sentiment, args.max_sentiment, args.min_pronounceability
-                ):
-                    generated_words.append(word)
-                    print(f"  - {word}")
+            if not generator.can_generate(compiled, args.min_len, args.max_len):
+                print(f"ERROR: The corpus cannot produce words of {args.min_len} to {args.max_len} characters that satisfy the constraints.", file=log)
+                return
+            # Steer walks off dictionary and corpus words instead of discarding them.
+            known_paths = ([str(dict_to_load)] if dictionary_set else []) + ([path for path, _ in args.corpus] if corpus_rejection_set else [])
+            if not known_paths:
+                avoid = None
+            elif args.no_cache:
+                known = [w for words in (dictionary_set, corpus_rejection_set) if words for w in words]
+                avoid = generator.WordTrie.build(compiled.alphabet, known, args.min_len, args.max_len)
+            else:
+                avoid = cache.load_word_trie(known_paths, compiled.alphabet, args.min_len, args.max_len)
+            job = parallel.CorpusJob(compiled, args.min_len, args.max_len, avoid)
+            max_candidates = count * 100 if count else None
+            if args.enumerate:
+                print(f"INFO: Enumerating {f'the {count} most probable words' if count else 'every word, most probable first'}...", file=log)
+            elif args.rank:
+                pool_size = args.pool if args.pool else count * 10
+                print(f"INFO: Generating {pool_size} candidates to rank...", file=log)
+                max_candidates = pool_size * 100
+            else:
+                print(f"INFO: Generating {count or 'unlimited'} words...", file=log)
+
+        constraints = validator.Constraints(
+            *length_window, args.matches_regex, args.reject_regex, dictionary_set, blocklist_set,
+            corpus_rejection_set, args.min_sentiment, args.max_sentiment, args.min_pronounceability,
+            blocked_substrings, neighbor_index, homophone_index,
+        )
+        seen = bloom.BloomFilter(args.bloom_capacity, args.bloom_error_rate) if args.dedup == "bloom" else set()
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+        if args.enumerate:
+            words = itertools.islice((word for word, _ in generator.enumerate_words(compiled, constraints)), count)
+            chunks = ([word] for word in words)
+        elif args.rank:
+            pool = list(parallel.generate(job, constraints, pool_size, jobs=jobs, seed=args.seed,
+                                          max_candidates=max_candidates, seen=seen, patience=GENERATE_PATIENCE))
+            import numpy as np
+            scores = generator.log_likelihood(scorer, pool)
+            chunks = [[pool[i] for i in np.argsort(-scores, kind="stable")[:count]]]
+        else:
+            chunks = parallel.generate_chunks(job, constraints, count, jobs=jobs, seed=args.seed,
+                                              max_candidates=max_candidates, seen=seen, patience=GENERATE_PATIENCE)
+        written = _emit(chunks, stream)
+        if written is not None and not args.enumerate and (count is None or written < count):
+            print(f"INFO: Stopped after {written} words; new words have become too rare to find.", file=log)
+
+    elif args.command == "validate" and args.input:
+        from . import parallel
+        constraints = validator.Constraints(
+            min_len=0, max_len=None, dictionary_set=dictionary_set, blocklist_set=blocklist_set,
+            blocked_substrings=blocked_substrings, neighbor_index=neighbor_index, homophone_index=homophone_index,
+        )
+        jobs = args.jobs if args.jobs > 0 else os.cpu_count()
+        _emit_records(parallel.score(_read_input(args.input), constraints, jobs=jobs), args.format)
 
     elif args.command == "validate":
-        is_valid = validator.validate_word(args.word, dictionary_set=dictionary_set, blocklist_set=blocklist_set)
+        is_valid = validator.validate_word(args.word, dictionary_set=dictionary_set, blocklist_set=blocklist_set,
+                                           blocked_substrings=blocked_substrings, neighbor_index=neighbor_index,
+                                           homophone_index=homophone_index)
         s_score = sentiment.analyze_word_sentiment(args.word)
         p_score = pronounce.score_pronounceability(args.word)
         print(f"Validating word: '{args.word}'")
         print(f"  - Validation Result:      {'Valid' if is_valid else 'Invalid'}")
         print(f"  - Sentiment Score:        {s_score:.3f}")
         print(f"  - Pronounceability Score: {p_score:.3f}")
+        if neighbor_index is not None:
+            near = neighbor_index.neighbors(args.word)
+            print(f"  - Known Words Within {neighbor_index.max_distance} Edit(s): {', '.join(near[:10]) if near else 'none'}")
+        if homophone_index is not None:
+            from . import phonetic
+            print(f"  - Sound Key:              {phonetic.sound_key(args.word)} ({'sounds like a known word' if args.word in homophone_index else 'no known word sounds alike'})")
 
     elif args.command == "rhyme":
         print(f"Analyzing word: '{args.word}'")
@@ -1,25 +1,114 @@
 # Contains the n-gram model training and word generation logic.
 
+import bisect
+import heapq
+import math
 import random
-from collections import defaultdict
-from . import utils
+from array import array
+from collections import Counter, defaultdict
+from itertools import accumulate
+import numpy as np
+from . import utils, validator
 
-def train_from_corpus(corpus_path: str, n: int = 3) -> tuple[dict, set]:
+# Partial words kept by enumerate_words() before the least likely are dropped.
+DEFAULT_MAX_FRONTIER = 250_000
+
+class CompactModel:
+    """
+    A count-weighted character n-gram model.
+
+    For each prefix, only the distinct successor characters are stored,
+    alongside an ``array`` of cumulative counts. Sampling is a bisect into
+    that array instead of a ``random.choice`` over one list entry per
+    occurrence, so the model is a small fraction of the size of the
+    list-based dictionary returned by ``train_from_corpus``.
+    """
+
+    __slots__ = ("n", "_table")
+
+    def __init__(self, n: int, table: dict[str, tuple[str, array]] | None = None):
+        self.n = n
+        self._table = table if table is not None else {}
+
+    @classmethod
+    def from_counts(cls, counts: dict[str, dict[str, float]], n: int) -> "CompactModel":
+        """Builds a model from a mapping of prefix -> {next_char: count}."""
+        table = {}
+        for prefix, successors in counts.items():
+            chars = "".join(sorted(c for c, count in successors.items() if count > 0))
+            if chars:
+                table[prefix] = (chars, array("d", accumulate(successors[c] for c in chars)))
+        return cls(n, table)
+
+    @classmethod
+    def from_model(cls, model: dict[str, list[str]], n: int) -> "CompactModel":
+        """Converts a list-based model from ``train_from_corpus`` to compact form."""
+        return cls.from_counts({prefix: Counter(chars) for prefix, chars in model.items()}, n)
+
+    def __contains__(self, prefix: str) -> bool:
+        return prefix in self._table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __iter__(self):
+        return iter(self._table)
+
+    def successors(self, prefix: str) -> tuple[str, array]:
+        """Returns the distinct successors of a prefix and their cumulative counts."""
+        return self._table[prefix]
+
+    def counts(self, prefix: str) -> dict[str, float]:
+        """Returns the successor counts of a prefix as a {char: count} dict."""
+        chars, cumulative = self._table[prefix]
+        return {c: cumulative[i] - (cumulative[i - 1] if i else 0) for i, c in enumerate(chars)}
+
+    def advance(self, prefix: str, char: str) -> str | None:
+        """
+        Returns the state reached by emitting ``char`` from ``prefix``: the
+        longest suffix of the last n-1 characters that the model has seen
+        as a prefix, or None if there is none (a dead end). For a plain
+        n-gram model this is simply ``prefix[1:] + char``.
+        """
+        if len(prefix) == self.n - 1:
+            # A full history: the longest suffix is nearly always seen.
+            state = prefix[1:] + char
+            if state in self._table:
+                return state
+            history, first = state, 1
+        else:
+            history, first = (prefix + char)[-(self.n - 1):], 0
+        for start in range(first, len(history)):
+            if history[start:] in self._table:
+                return history[start:]
+        return None
+
+    def choose(self, prefix: str, rng: random.Random = random) -> str:
+        """Samples a successor of ``prefix`` in proportion to its count."""
+        chars, cumulative = self._table[prefix]
+        # Searching below the last successor guards against rounding
+        # pushing the draw onto the total itself.
+        return chars[bisect.bisect_right(cumulative, rng.random() * cumulative[-1], 0, len(chars) - 1)]
+
+def train_from_corpus(corpus_path: str, n: int = 3, compact: bool = False) -> tuple[dict | CompactModel, set]:
     """
     Reads a corpus file once to train a character-level n-gram model
     and create a set of all words in the corpus for novelty checking.
     
     The model is a dictionary where keys are prefixes of length (n-1)
     and values are lists of characters that can follow that prefix.
+    With ``compact=True``, a count-weighted CompactModel is returned
+    instead.
 
     Args:
         corpus_path: Path to the text file to train on (one word per line).
         n: The order of the n-gram model (e.g., 3 for trigrams).
+        compact: Whether to return a CompactModel rather than a dict of lists.
 
     Returns:
-        A tuple containing (model_dict, corpus_word_set).
+        A tuple containing (model, corpus_word_set).
     """
-    model = defaultdict(list)
+    model = defaultdict(Counter) if compact else defaultdict(list)
     corpus_word_set = set()
     
     # Use special characters for start and end of a word
@@ -42,19 +131,58 @@ def train_from_corpus(corpus_path: str, n: int = 3) -> tuple[dict, set]:
                 for i in range(len(padded_word) - prefix_len):
                     prefix = padded_word[i : i + prefix_len]
                     next_char = padded_word[i + prefix_len]
-                    model[prefix].append(next_char)
+                    if compact:
+                        model[prefix][next_char] += 1
+                    else:
+                        model[prefix].append(next_char)
     except FileNotFoundError:
         print(f"ERROR: Corpus file not found at {corpus_path}")
         return {}, set()
-        
+
+    if compact:
+        return CompactModel.from_counts(model, n), corpus_word_set
     return dict(model), corpus_word_set
 
-def generate_word(model: dict, min_len: int = 5, max_len: int = 10, n: int = 3) -> str:
+def train_backoff(corpus_path: str, n: int = 3) -> tuple[CompactModel | dict, set]:
+    """
+    Trains an interpolated n-gram model that backs off through every order
+    from n down to 2, counting all orders in a single pass over the corpus
+    (see ngrams.NgramTrie).
+
+    Each prefix seen in training, of any length from 1 to n-1, gets a
+    Witten-Bell interpolated distribution: its own counts blended with the
+    distribution of its one-shorter suffix, weighted by how many distinct
+    successors it has. Generation tracks the longest seen suffix of the
+    history (see CompactModel.advance), so a walk never dead-ends, while
+    well-attested long prefixes keep most of their high-order flavor.
+
+    Args:
+        corpus_path: Path to the text file to train on (one word per line).
+        n: The highest order to interpolate from.
+
+    Returns:
+        A tuple containing (model, corpus_word_set).
+    """
+    # Imported here because ngrams builds on this module.
+    from . import ngrams
+
+    try:
+        trie = ngrams.NgramTrie.from_corpus(corpus_path, max_order=max(n, 2))
+    except FileNotFoundError:
+        print(f"ERROR: Corpus file not found at {corpus_path}")
+        return {}, set()
+    except ngrams.AlphabetTooLarge as e:
+        print(f"ERROR: Cannot train an order-{n} backoff model on '{corpus_path}': {e}.")
+        return {}, set()
+    return trie.model(n, backoff=True), trie.corpus_word_set
+
+def generate_word(model: dict | CompactModel, min_len: int = 5, max_len: int = 10, n: int = 3) -> str:
     """
     Generates a single word using the trained n-gram model.
 
     Args:
-        model: The trained n-gram model from train_model().
+        model: The trained n-gram model from train_from_corpus(), either
+            list-based or compact.
         min_len: The minimum length of the generated word.
         max_len: The maximum length of the generated word.
         n: The order of the n-gram model used for generation.
@@ -69,26 +197,572 @@ def generate_word(model: dict, min_len: int = 5, max_len: int = 10, n: int = 3)
     end_char = "$"
     prefix_len = n - 1
 
+    if isinstance(model, CompactModel):
+        table, choose, advance = model._table, model.choose, model.advance
+    else:
+        table = model
+        def choose(prefix):
+            return random.choice(model[prefix])
+        def advance(prefix, char):
+            return prefix[1:] + char
+
     # Loop until a valid word is generated
     for _ in range(100): # Max attempts to prevent infinite loops
         word_chars = []
         current_prefix = start_char * prefix_len
         
         for _ in range(max_len):
-            if current_prefix not in model:
+            if current_prefix is None or current_prefix not in table:
                 # This prefix was not seen during training, dead end.
                 break 
 
-            next_char = random.choice(model[current_prefix])
-
+            next_char = choose(current_prefix)
             if next_char == end_char:
                 break
             
             word_chars.append(next_char)
-            current_prefix = current_prefix[1:] + next_char
+            current_prefix = advance(current_prefix, next_char)
         
         final_word = "".join(word_chars)
         if min_len <= len(final_word) <= max_len:
             return final_word
 
     return "" # Return empty if we couldn't generate a valid word
+
+
+class CompiledModel:
+    """
+    An integer-encoded n-gram model for vectorized, batched generation.
+
+    Characters are indexed into ``alphabet``, where index 0 is the end
+    marker. States are the model's prefixes, numbered so that ``start`` is
+    the all-``^`` prefix. Transitions form a CSR table: the edges leaving
+    state ``s`` are ``indptr[s]:indptr[s + 1]``, each with a ``symbols``
+    index, a transition probability in ``probs`` and a destination state in
+    ``dests`` (-1 for the end marker or a prefix the model never saw).
+    """
+
+    def __init__(self, n: int, alphabet: str, prefixes: list[str], indptr: np.ndarray,
+                 symbols: np.ndarray, probs: np.ndarray, dests: np.ndarray):
+        self.n = n
+        self.alphabet = alphabet
+        self.prefixes = prefixes
+        self.indptr = indptr
+        self.symbols = symbols
+        self.probs = probs
+        self.dests = dests
+        self.start = 0
+        self._length_keys = {}
+        self._edge_keys = None
+
+    def __len__(self) -> int:
+        return len(self.prefixes)
+
+    def decode(self, symbols: np.ndarray) -> list[str]:
+        """Decodes a (k, width) matrix of symbol indexes, 0-padded, to strings."""
+        if symbols.shape[1] == 0:
+            return [""] * symbols.shape[0]
+        glyphs = np.array(["\0"] + list(self.alphabet[1:]), dtype="<U1")
+        rows = glyphs[symbols].view(f"<U{symbols.shape[1]}")[:, 0]
+        return rows.tolist()
+
+class WordTrie:
+    """
+    A prefix trie of words to steer walks away from, over a CompiledModel's
+    alphabet, in CSR form for lockstep lookups.
+
+    Node 0 is the empty prefix and the other nodes are numbered depth by
+    depth, so the ``parent * len(alphabet) + symbol`` keys of every edge
+    come out sorted and the child along edge ``i`` is node ``i + 1``.
+    ``terminal`` flags the nodes that complete a word.
+    """
+
+    def __init__(self, alphabet: str, keys: np.ndarray, terminal: np.ndarray):
+        self.alphabet = alphabet
+        self.keys = keys
+        self.terminal = terminal
+
+    def __len__(self) -> int:
+        return len(self.terminal)
+
+    @classmethod
+    def build(cls, alphabet: str, words, min_len: int = 0, max_len: int | None = None) -> "WordTrie":
+        """
+        Builds the trie of the words a model with ``alphabet`` could
+        produce within ``[min_len, max_len]``; other words can never be
+        generated, so they are left out.
+        """
+        words = [w for w in words if max(min_len, 1) <= len(w) <= (max_len if max_len is not None else len(w))]
+        width = max(map(len, words), default=0)
+        codes = np.array(words, dtype=f"<U{max(width, 1)}").view(np.uint32).reshape(len(words), max(width, 1))[:, :width]
+        lookup = np.full(max(codes.max(initial=0), *map(ord, alphabet)) + 1, -1, dtype=np.int64)
+        lookup[[ord(c) for c in alphabet[1:]]] = np.arange(1, len(alphabet))
+        symbols = lookup[codes]
+        lengths = np.array([len(w) for w in words], dtype=np.int64)
+        usable = ~((symbols < 0) & (np.arange(width) < lengths[:, None])).any(axis=1)
+        symbols, lengths = symbols[usable], lengths[usable]
+
+        nodes = np.zeros(len(lengths), dtype=np.int64)
+        keys = []
+        size = 1
+        for depth in range(width):
+            rows = np.flatnonzero(lengths > depth)
+            level, inverse = np.unique(nodes[rows] * len(alphabet) + symbols[rows, depth], return_inverse=True)
+            nodes[rows] = size + inverse
+            keys.append(level)
+            size += len(level)
+        terminal = np.zeros(size, dtype=bool)
+        terminal[nodes[lengths > 0]] = True
+        return cls(alphabet, np.concatenate(keys) if keys else np.zeros(0, dtype=np.int64), terminal)
+
+    def step(self, nodes: np.ndarray, symbols: np.ndarray) -> np.ndarray:
+        """Follows one symbol from each node; -1 once a walk leaves the trie."""
+        targets = nodes * len(self.alphabet) + symbols
+        edges = np.minimum(np.searchsorted(self.keys, targets), max(len(self.keys) - 1, 0))
+        found = (nodes >= 0) & (edges < len(self.keys))
+        found[found] = self.keys[edges[found]] == targets[found]
+        return np.where(found, edges + 1, -1)
+
+    def completes(self, nodes: np.ndarray) -> np.ndarray:
+        """Whether each node (or -1) completes a word in the trie."""
+        return (nodes >= 0) & self.terminal[np.maximum(nodes, 0)]
+
+def _cumulative_keys(indptr: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Builds sorted sampling keys for a CSR table: the edges of row ``s`` get
+    keys in ``(s, s + 1]`` spaced by their normalized weights, so that
+    ``np.searchsorted(keys, s + u, side="right")`` with ``u`` uniform in
+    [0, 1) picks an edge of row ``s`` in proportion to its weight. Rows
+    with no weight get keys of exactly ``s`` and must be treated as dead.
+    """
+    counts = np.diff(indptr)
+    rows = np.repeat(np.arange(len(counts)), counts)
+    cumulative = np.cumsum(weights, dtype=np.float64)
+    offsets = np.concatenate(([0.0], cumulative))[indptr[:-1]]
+    totals = np.concatenate(([0.0], cumulative))[indptr[1:]] - offsets
+    within = cumulative - np.repeat(offsets, counts)
+    row_totals = np.repeat(totals, counts)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.where(row_totals > 0, within / row_totals, 0.0)
+    # Pin each row's last key to exactly s + 1 so rounding can never make a
+    # draw fall through into the next row.
+    last = indptr[1:][counts > 0] - 1
+    fraction[last] = np.where(totals[counts > 0] > 0, 1.0, 0.0)
+    return rows + fraction
+
+def compile_model(model: dict | CompactModel, n: int = 3) -> CompiledModel:
+    """
+    Compiles a trained model into an integer-encoded CompiledModel.
+
+    Only the prefixes reachable from the start prefix become states.
+
+    Args:
+        model: A model from train_from_corpus(), list-based or compact.
+        n: The order of a list-based model; ignored for a CompactModel.
+
+    Returns:
+        The compiled model.
+    """
+    if not isinstance(model, CompactModel):
+        model = CompactModel.from_model(model, n)
+    n = model.n
+    start = "^" * (n - 1)
+
+    chars = sorted({c for prefix in model for c in model.successors(prefix)[0]} - {"$"})
+    alphabet = "$" + "".join(chars)
+    index = {c: i for i, c in enumerate(alphabet)}
+
+    state_ids = {start: 0}
+    prefixes = [start]
+    indptr = [0]
+    symbols, probs, dests = [], [], []
+    i = 0
+    while i < len(prefixes):
+        prefix = prefixes[i]
+        i += 1
+        if prefix in model:
+            successors, cumulative = model.successors(prefix)
+            total = cumulative[-1]
+            previous = 0.0
+            edges = []
+            for c, count in zip(successors, cumulative):
+                dest = -1
+                if c != "$":
+                    next_prefix = model.advance(prefix, c)
+                    if next_prefix is not None:
+                        if next_prefix not in state_ids:
+                            state_ids[next_prefix] = len(prefixes)
+                            prefixes.append(next_prefix)
+                        dest = state_ids[next_prefix]
+                edges.append((index[c], (count - previous) / total, dest))
+                previous = count
+            for symbol, prob, dest in sorted(edges):
+                symbols.append(symbol)
+                probs.append(prob)
+                dests.append(dest)
+        indptr.append(len(symbols))
+
+    return CompiledModel(
+        n, alphabet, prefixes,
+        np.array(indptr, dtype=np.int64),
+        np.array(symbols, dtype=np.int32),
+        np.array(probs, dtype=np.float64),
+        np.array(dests, dtype=np.int64),
+    )
+
+def length_mass(model: CompiledModel, max_len: int) -> np.ndarray:
+    """
+    Computes, for every state, the probability that a walk from it emits
+    exactly ``L`` more characters before the end marker, for each ``L`` up
+    to ``max_len``. This is a DP over the n-gram automaton: the mass for
+    ``L`` is the end-marker probability when ``L == 0``, and otherwise the
+    sum over each character edge of its probability times the destination
+    state's mass for ``L - 1``.
+
+    Returns:
+        An array of shape (max_len + 1, len(model)).
+    """
+    counts = np.diff(model.indptr)
+    rows = np.repeat(np.arange(len(model)), counts)
+    ends = model.symbols == 0
+    steps = ~ends & (model.dests >= 0)
+    mass = np.zeros((max_len + 1, len(model)))
+    mass[0] = np.bincount(rows[ends], weights=model.probs[ends], minlength=len(model))
+    for length in range(1, max_len + 1):
+        weights = model.probs[steps] * mass[length - 1][model.dests[steps]]
+        mass[length] = np.bincount(rows[steps], weights=weights, minlength=len(model))
+    return mass
+
+def _length_conditioned_keys(model: CompiledModel, min_len: int, max_len: int) -> list[np.ndarray] | None:
+    """
+    Returns per-step sampling keys (see _cumulative_keys) that draw each
+    transition in proportion to its probability times the mass of walks
+    through it that end within ``[min_len, max_len]``, or None if no such
+    walk exists. Step ``t`` is the draw made after ``t`` characters.
+    """
+    window = (min_len, max_len)
+    if window not in model._length_keys:
+        mass = length_mass(model, max_len)
+        # remaining[t][s]: mass of walks from s, with t characters already
+        # emitted, whose total length lands in the window.
+        cumulative = np.vstack((np.zeros(len(model)), np.cumsum(mass, axis=0)))
+        remaining = np.zeros((max_len + 2, len(model)))
+        for t in range(max_len + 1):
+            remaining[t] = cumulative[max_len - t + 1] - cumulative[max(min_len - t, 0)]
+        if remaining[0][model.start] <= 0:
+            model._length_keys[window] = None
+        else:
+            ends = model.symbols == 0
+            dests = np.maximum(model.dests, 0)
+            keys = []
+            for t in range(max_len + 1):
+                weights = np.where(model.dests >= 0, model.probs * remaining[t + 1][dests], 0.0)
+                weights[ends] = model.probs[ends] if min_len <= t else 0.0
+                keys.append(_cumulative_keys(model.indptr, weights))
+            model._length_keys[window] = keys
+    return model._length_keys[window]
+
+def can_generate(model: CompiledModel, min_len: int, max_len: int) -> bool:
+    """Returns whether the model can produce any word within the length window."""
+    min_len = max(min_len, 0)
+    return bool(len(model)) and min_len <= max_len and _length_conditioned_keys(model, min_len, max_len) is not None
+
+def generate_batch(
+    model: CompiledModel | CompactModel | dict,
+    k: int,
+    min_len: int = 5,
+    max_len: int = 10,
+    n: int = 3,
+    rng: np.random.Generator | int | None = None,
+    avoid: WordTrie | None = None,
+) -> list[str]:
+    """
+    Generates ``k`` words at once by advancing ``k`` random walks through a
+    compiled model in lockstep, with one vectorized draw per step.
+
+    Walks are length-aware: each transition is drawn in proportion to its
+    probability times the mass of completions through it that end on the
+    end marker within ``[min_len, max_len]`` (see length_mass()). Every walk
+    therefore yields a word of valid length, and words follow the same
+    distribution as rejection-sampling complete walks would give. Unlike
+    generate_word(), words are never truncated at ``max_len``.
+
+    With ``avoid``, each walk also tracks its node in that trie of known
+    words. A walk about to end on one of them redraws among its character
+    successors instead, so it carries on towards a novel word rather than
+    being thrown away by validation; it is dropped only if it cannot
+    continue within ``max_len``.
+
+    Args:
+        model: A CompiledModel, or a model to compile on the fly.
+        k: The number of words to generate.
+        min_len: The minimum length of a generated word.
+        max_len: The maximum length of a generated word.
+        n: The order of a list-based model; ignored otherwise.
+        rng: A NumPy Generator or seed for reproducible output.
+        avoid: A WordTrie, over the model's alphabet, of words not to end on.
+
+    Returns:
+        The generated words, in walk order (fewer than ``k`` only if some
+        walks could not avoid a known word), or an empty list if the model
+        cannot produce any word within the length window.
+    """
+    if not isinstance(model, CompiledModel):
+        model = compile_model(model, n)
+    min_len = max(min_len, 0)
+    if k <= 0 or not can_generate(model, min_len, max_len):
+        return []
+    keys = _length_conditioned_keys(model, min_len, max_len)
+    rng = np.random.default_rng(rng)
+
+    states = np.full(k, model.start, dtype=np.int64)
+    symbols = np.zeros((k, max_len), dtype=np.int32)
+    nodes = np.zeros(k, dtype=np.int64)
+    stuck = np.zeros(k, dtype=bool)
+    alive = np.arange(k)
+    for step in range(max_len + 1):
+        if not alive.size:
+            break
+        edges = np.searchsorted(keys[step], states[alive] + rng.random(alive.size), side="right")
+        if avoid is not None:
+            edges = _steer(model, keys[step], states[alive], edges, avoid.completes(nodes[alive]), rng)
+            stuck[alive[edges < 0]] = True
+            alive, edges = alive[edges >= 0], edges[edges >= 0]
+        chosen = model.symbols[edges]
+        keep = chosen != 0
+        alive, edges = alive[keep], edges[keep]
+        if step < max_len:
+            symbols[alive, step] = chosen[keep]
+            states[alive] = model.dests[edges]
+            if avoid is not None:
+                nodes[alive] = avoid.step(nodes[alive], chosen[keep])
+
+    return [word for word, failed in zip(model.decode(symbols), stuck) if not failed]
+
+def _steer(model: CompiledModel, keys: np.ndarray, states: np.ndarray, edges: np.ndarray,
+           known: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """
+    Redraws the walks in ``known`` that picked the end marker among their
+    other edges, in proportion to those edges' weights. The end marker is
+    symbol 0, so it is the first edge of its row: drawing above its key
+    skips it. Walks with nothing else to draw get an edge of -1.
+    """
+    redraw = np.flatnonzero(known & (model.symbols[edges] == 0))
+    if not redraw.size:
+        return edges
+    rows = states[redraw].astype(np.float64)
+    floor = keys[model.indptr[states[redraw]]]
+    targets = floor + rng.random(redraw.size) * (rows + 1 - floor)
+    targets = np.minimum(targets, np.nextafter(rows + 1, rows))
+    edges = edges.copy()
+    edges[redraw] = np.where(floor < rows + 1, np.searchsorted(keys, targets, side="right"), -1)
+    return edges
+
+def char_log_probs(model: CompiledModel, words: list[str]) -> np.ndarray:
+    """
+    Scores every character of a batch of words under a compiled model at
+    once. The words are encoded into a padded symbol matrix and walked
+    through the model in lockstep; each step finds every word's edge with
+    one binary search over the globally sorted ``(state, symbol)`` keys of
+    the CSR table, then gathers its probability and destination.
+
+    Args:
+        model: The compiled model to score against.
+        words: The words to score.
+
+    Returns:
+        A ``(len(words), width + 1)`` array, where ``width`` is the longest
+        word: column ``t`` of a word's row is the natural log-probability of
+        its ``t``-th character, column ``len(word)`` that of the end marker,
+        and later columns are 0. A transition the model never makes scores
+        ``-inf``, as does everything after it.
+    """
+    if model._edge_keys is None:
+        rows = np.repeat(np.arange(len(model.indptr) - 1), np.diff(model.indptr))
+        model._edge_keys = rows * len(model.alphabet) + model.symbols
+    width = max(map(len, words), default=0)
+    codes = np.array(words, dtype=f"<U{max(width, 1)}").view(np.uint32).reshape(len(words), max(width, 1))[:, :width]
+    lookup = np.full(max(codes.max(initial=0), *map(ord, model.alphabet)) + 1, -1, dtype=np.int64)
+    lookup[[ord(c) for c in model.alphabet[1:]]] = np.arange(1, len(model.alphabet))
+    lookup[0] = 0  # the padding after each word reads as the end marker
+    symbols = np.pad(lookup[codes], ((0, 0), (0, 1)))
+    lengths = np.array([len(w) for w in words], dtype=np.int64)
+
+    scores = np.zeros(symbols.shape, dtype=np.float64)
+    states = np.full(len(words), model.start, dtype=np.int64)
+    alive = np.arange(len(words))
+    for step in range(width + 1):
+        alive = alive[lengths[alive] >= step]
+        if not alive.size:
+            break
+        targets = states[alive] * len(model.alphabet) + symbols[alive, step]
+        edges = np.minimum(np.searchsorted(model._edge_keys, targets), len(model._edge_keys) - 1)
+        found = (model._edge_keys[edges] == targets) & (states[alive] >= 0) & (symbols[alive, step] >= 0)
+        with np.errstate(divide="ignore"):
+            scores[alive, step] = np.where(found, np.log(model.probs[edges]), -np.inf)
+        dead = alive[~found]
+        scores[dead, step + 1:] = np.where(np.arange(step + 1, width + 1) <= lengths[dead, None], -np.inf, 0.0)
+        alive, edges = alive[found], edges[found]
+        states[alive] = model.dests[edges]
+    return scores
+
+def log_likelihood(model: CompiledModel, words: list[str], per_char: bool = True) -> np.ndarray:
+    """
+    Scores how likely the corpus model is to produce each word, vectorized
+    over the whole batch (see char_log_probs()).
+
+    Args:
+        model: The compiled model to score against.
+        words: The words to score.
+        per_char: Average over the characters and end marker, so words of
+            different lengths compare fairly, instead of summing.
+
+    Returns:
+        The log-likelihood of each word, ``-inf`` if the model cannot
+        produce it.
+    """
+    if not words:
+        return np.zeros(0)
+    totals = char_log_probs(model, words).sum(axis=1)
+    if per_char:
+        totals /= np.array([len(w) + 1 for w in words], dtype=np.float64)
+    return totals
+
+def _best_completion(model: CompiledModel, min_len: int, max_len: int) -> np.ndarray:
+    """
+    The max-product counterpart of length_mass(): ``best[t][s]`` is the
+    probability of the single most likely walk from state ``s``, with ``t``
+    characters already emitted, that ends within ``[min_len, max_len]``
+    (0 if none does). Has shape (max_len + 2, len(model)).
+    """
+    rows = np.repeat(np.arange(len(model)), np.diff(model.indptr))
+    ends = model.symbols == 0
+    steps = ~ends & (model.dests >= 0)
+    exact = np.zeros((max_len + 1, len(model)))
+    np.maximum.at(exact[0], rows[ends], model.probs[ends])
+    for length in range(1, max_len + 1):
+        np.maximum.at(exact[length], rows[steps], model.probs[steps] * exact[length - 1][model.dests[steps]])
+    best = np.zeros((max_len + 2, len(model)))
+    for t in range(max_len + 1):
+        best[t] = exact[max(min_len - t, 0):max_len - t + 1].max(axis=0)
+    return best
+
+def enumerate_words(
+    model: CompiledModel | CompactModel | dict,
+    constraints: validator.Constraints,
+    *,
+    n: int = 3,
+    max_frontier: int = DEFAULT_MAX_FRONTIER,
+):
+    """
+    Enumerates the words a model can produce in descending order of
+    probability, instead of sampling them.
+
+    This is a best-first (A*) search over partial words. Each is ranked by
+    its own probability times the probability of its most likely
+    completion within ``constraints.min_len``/``max_len`` (see
+    _best_completion()), which is exact, so words come off the queue in
+    order and prefixes that cannot finish within the length window are
+    never queued. Complete words must pass ``constraints`` (e.g. not be a
+    dictionary or corpus word) to be yielded.
+
+    Args:
+        model: A CompiledModel, or a model to compile on the fly.
+        constraints: The checks every word must pass.
+        n: The order of a list-based model; ignored otherwise.
+        max_frontier: Memory bound on queued partial words. When it is
+            exceeded the least likely half are dropped, after which rare
+            words may be skipped, but those yielded stay in order.
+
+    Yields:
+        (word, log_probability) pairs, most likely first, until the model
+        is exhausted.
+    """
+    if constraints.max_len is None:
+        raise ValueError("enumerating a corpus model needs a max_len")
+    if not isinstance(model, CompiledModel):
+        model = compile_model(model, n)
+    min_len, max_len = max(constraints.min_len, 0), constraints.max_len
+    if not can_generate(model, min_len, max_len):
+        return
+    best = _best_completion(model, min_len, max_len)
+    indptr, symbols, dests = model.indptr.tolist(), model.symbols.tolist(), model.dests.tolist()
+    with np.errstate(divide="ignore"):
+        log_probs = np.log(model.probs).tolist()
+        log_best = np.log(best).tolist()
+
+    # Entries are (-bound, log_prob, word, state); a state of -1 marks a
+    # complete word, whose bound is its own probability.
+    heap = [(-log_best[0][model.start], 0.0, "", model.start)]
+    while heap:
+        _, log_prob, word, state = heapq.heappop(heap)
+        if state < 0:
+            if constraints.validate(word):
+                yield word, log_prob
+            continue
+        t = len(word)
+        for edge in range(indptr[state], indptr[state + 1]):
+            score = log_prob + log_probs[edge]
+            if symbols[edge] == 0:
+                if t >= min_len:
+                    heapq.heappush(heap, (-score, score, word, -1))
+            elif dests[edge] >= 0 and t < max_len:
+                bound = score + log_best[t + 1][dests[edge]]
+                if bound > -math.inf:
+                    heapq.heappush(heap, (-bound, score, word + model.alphabet[symbols[edge]], dests[edge]))
+        if len(heap) > 2 * max_frontier:
+            heap = heapq.nsmallest(max_frontier, heap)
+
+def iter_words(
+    model: CompiledModel | CompactModel | dict,
+    constraints: validator.Constraints,
+    *,
+    n: int = 3,
+    seed: int | None = None,
+    jobs: int = 1,
+    seen=None,
+    max_candidates: int | None = None,
+    patience: int | None = None,
+    avoid: "WordTrie | None" = None,
+):
+    """
+    Streams unique words from a model that satisfy ``constraints``, without
+    end unless ``max_candidates`` is given. Generation is length-aware
+    within ``constraints.min_len``/``max_len``, steers away from ending on
+    dictionary and corpus words (see generate_batch()), and runs on the
+    parallel engine, so a given ``seed`` yields the same stream for any
+    ``jobs``.
+
+    Args:
+        model: A CompiledModel, or a model to compile on the fly.
+        constraints: The checks every word must pass.
+        n: The order of a list-based model; ignored otherwise.
+        seed: Seed for reproducible output.
+        jobs: Worker processes to generate with.
+        seen: The dedup container (a set by default; a bloom.BloomFilter
+            keeps memory bounded on very long streams).
+        max_candidates: Stop after roughly this many candidates.
+        patience: Stop after this many consecutive chunks of candidates
+            without a new word (see parallel.generate()).
+        avoid: The WordTrie of words to steer away from, e.g. from
+            cache.load_word_trie(); by default it is built from the
+            dictionary and corpus sets in ``constraints`` on every call.
+
+    Yields:
+        Generated words, in a deterministic order for a given seed.
+    """
+    # Imported here because parallel builds on this module.
+    from . import parallel
+
+    if constraints.max_len is None:
+        raise ValueError("generating from a corpus model needs a max_len")
+    if not isinstance(model, CompiledModel):
+        model = compile_model(model, n)
+    if not can_generate(model, constraints.min_len, constraints.max_len):
+        return
+    if avoid is None:
+        known = [w for words in (constraints.dictionary_set, constraints.corpus_rejection_set) if words for w in words]
+        avoid = WordTrie.build(model.alphabet, known, constraints.min_len, constraints.max_len) if known else None
+    job = parallel.CorpusJob(model, constraints.min_len, constraints.max_len, avoid)
+    yield from parallel.generate(job, constraints, None, jobs=jobs, seed=seed,
+                                 max_candidates=max_candidates, seen=seen, patience=patience)
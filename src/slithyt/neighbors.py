@@ -0,0 +1,181 @@
+"""slithyt.neighbors — find known words within a few edits of a candidate.
+
+A generated word one typo away from a dictionary word, a corpus word or a
+blocked word is rarely what anyone wants. ``EditIndex`` answers "is any
+known word within ``max_distance`` edits (Levenshtein) of this one?" with
+a symmetric-delete index, as in SymSpell: every string reachable from a
+known word by deleting up to ``max_distance`` characters is indexed, so two
+words within that distance always share such a variant, and looking up a
+candidate's own deletion variants yields every near word to check.
+
+The variants are stored as sorted 64-bit hashes with the id of the word
+each came from, followed by a ``wordindex.WordIndex`` of the words, all in
+one file that is opened with ``mmap``. Hash collisions only add candidates,
+which the exact distance check then discards.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import zlib
+from collections.abc import Iterable
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+from . import wordindex
+
+MAGIC = b"SLED"
+VERSION = 1
+# Magic, version, max distance, variant count; 24 bytes keep the hashes 8-byte aligned.
+_HEADER = struct.Struct("<4sIQQ")
+
+
+def _variants(word: str, max_distance: int) -> set[str]:
+    """Every string left by deleting up to ``max_distance`` characters of ``word``."""
+    variants = {word}
+    for deletions in range(1, min(max_distance, len(word)) + 1):
+        for gone in combinations(range(len(word)), deletions):
+            variants.add("".join(c for i, c in enumerate(word) if i not in gone))
+    return variants
+
+
+def _hash(variant: str) -> int:
+    encoded = variant.encode("utf-8")
+    return zlib.crc32(encoded) << 32 | zlib.adler32(encoded)
+
+
+def distance(a: str, b: str) -> int:
+    """The Levenshtein distance between ``a`` and ``b``, by Myers' bit-parallel
+    algorithm: one column of the DP table per character of ``b``, held as
+    bit vectors of vertical +1/-1 steps."""
+    if not a:
+        return len(b)
+    masks = {}
+    for i, char in enumerate(a):
+        masks[char] = masks.get(char, 0) | 1 << i
+    full = (1 << len(a)) - 1
+    top = 1 << (len(a) - 1)
+    plus, minus, score = full, 0, len(a)
+    for char in b:
+        eq = masks.get(char, 0)
+        xv = eq | minus
+        xh = (((eq & plus) + plus) ^ plus) | eq
+        hplus = minus | (~(xh | plus) & full)
+        hminus = plus & xh
+        if hplus & top:
+            score += 1
+        elif hminus & top:
+            score -= 1
+        hplus = ((hplus << 1) | 1) & full
+        hminus = (hminus << 1) & full
+        plus = hminus | (~(xv | hplus) & full)
+        minus = hplus & xv
+    return score
+
+
+def within(a: str, b: str, limit: int) -> bool:
+    """Whether the Levenshtein distance between ``a`` and ``b`` is at most ``limit``."""
+    return abs(len(a) - len(b)) <= limit and distance(a, b) <= limit
+
+
+def pack(words: Iterable[str], max_distance: int) -> bytes:
+    """Return the edit index of ``words`` as bytes."""
+    if max_distance < 0:
+        raise ValueError("max_distance must not be negative")
+    words_bytes = wordindex.pack(words)
+    index = wordindex.WordIndex(words_bytes)
+    keys, ids = [], []
+    for word_id, word in enumerate(index):
+        for variant in _variants(word, max_distance):
+            keys.append(_hash(variant))
+            ids.append(word_id)
+    keys = np.array(keys, dtype=np.uint64)
+    ids = np.array(ids, dtype=np.uint32)
+    order = np.argsort(keys, kind="stable")
+    return b"".join((
+        _HEADER.pack(MAGIC, VERSION, max_distance, len(keys)),
+        keys[order].tobytes(),
+        ids[order].tobytes(),
+        words_bytes,
+    ))
+
+
+def write(words: Iterable[str], max_distance: int, path: str | os.PathLike) -> None:
+    """Write the edit index of ``words`` to ``path``, atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(pack(words, max_distance))
+    os.replace(tmp, path)
+
+
+class EditIndex:
+    """Known words, searchable by edit distance (see the module docs)."""
+
+    def __init__(self, buffer, path: str | None = None):
+        if len(buffer) < _HEADER.size:
+            raise ValueError("not a slithyt edit index")
+        magic, version, max_distance, count = _HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a slithyt edit index, or written by another version")
+        self.path = path
+        self.max_distance = max_distance
+        self._buffer = buffer
+        start = _HEADER.size
+        self._keys = np.frombuffer(buffer, dtype=np.uint64, count=count, offset=start)
+        self._ids = np.frombuffer(buffer, dtype=np.uint32, count=count, offset=start + 8 * count)
+        self.words = wordindex.WordIndex(buffer, path, offset=start + 12 * count)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> "EditIndex":
+        """Memory-map an index file written by ``write``."""
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise ValueError("not a slithyt edit index")
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, str(path))
+
+    @classmethod
+    def from_words(cls, words: Iterable[str], max_distance: int) -> "EditIndex":
+        """Build an index in memory, without a file."""
+        return cls(pack(words, max_distance))
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def _candidates(self, word: str):
+        """The known words sharing a deletion variant with ``word``."""
+        probes = np.array(sorted(_hash(v) for v in _variants(word, self.max_distance)), dtype=np.uint64)
+        starts = np.searchsorted(self._keys, probes, side="left")
+        ends = np.searchsorted(self._keys, probes, side="right")
+        hits = [self._ids[start:end] for start, end in zip(starts, ends) if end > start]
+        for i in np.unique(np.concatenate(hits)).tolist() if hits else ():
+            yield self.words._word(i).decode("utf-8")
+
+    def neighbors(self, word: str) -> list[str]:
+        """Every known word within ``max_distance`` edits of ``word``, sorted."""
+        word = word.lower()
+        return sorted(w for w in self._candidates(word) if within(word, w, self.max_distance))
+
+    def __contains__(self, word) -> bool:
+        """Whether any known word is within ``max_distance`` edits of ``word``."""
+        if not isinstance(word, str):
+            return False
+        word = word.lower()
+        return any(within(word, w, self.max_distance) for w in self._candidates(word))
+
+    def __getstate__(self):
+        if self.path is None:
+            return {"buffer": bytes(self._buffer)}
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        if "path" in state:
+            self.__dict__.update(EditIndex.open(state["path"]).__dict__)
+        else:
+            self.__init__(state["buffer"])
@@ -0,0 +1,302 @@
+# src/slithyt/ngrams.py
+#
+# A single-pass count index over every n-gram order of a corpus, from which
+# models of any order up to a maximum are derived without rereading it.
+
+import numpy as np
+from array import array
+from collections import Counter
+from . import utils
+from .generator import CompactModel
+
+# The highest order indexed by default, so sweeping --ngram-size from 2 to 6
+# never needs the corpus again.
+DEFAULT_MAX_ORDER = 6
+
+_PAD = "^"
+_END = "$"
+
+class AlphabetTooLarge(ValueError):
+    """
+    Raised when a corpus has too many distinct characters for its n-gram
+    codes to fit in 64 bits at the requested order; ``max_order`` is the
+    highest order that does fit.
+    """
+
+    def __init__(self, size: int, order: int, max_order: int):
+        super().__init__(f"an alphabet of {size} characters is too large to index order {order} "
+                         f"(at most order {max_order})")
+        self.max_order = max_order
+
+class NgramTrie:
+    """
+    Successor counts for every prefix of length 0 to ``max_order - 1`` in a
+    corpus, built in one vectorized pass, stored as a suffix trie laid out
+    level by level.
+
+    Characters are integer symbols, their index in the sorted ``alphabet``
+    (which includes the ``^`` padding and ``$`` end marker). Level ``k`` holds the sorted
+    base-``len(alphabet)`` codes of every length-``k`` prefix seen in
+    training, first character most significant, plus a CSR table of each
+    prefix's successor symbols and counts. A prefix's parent in the trie,
+    its one-shorter suffix, is its code with the leading digit dropped, so
+    backing off is a modulo and a binary search.
+
+    Counts are kept exactly, with how often each corpus word occurred, so
+    the trie can be updated in place with ``add_words``/``remove_words``.
+    """
+
+    def __init__(self, alphabet: str, max_order: int, levels: list[tuple], word_counts: Counter):
+        self.alphabet = alphabet
+        self.max_order = max_order
+        self.levels = levels
+        self.word_counts = word_counts
+
+    @property
+    def corpus_word_set(self) -> set:
+        """The distinct words in the corpus, for novelty rejection."""
+        return set(self.word_counts)
+
+    @classmethod
+    def from_words(cls, words, max_order: int = DEFAULT_MAX_ORDER) -> "NgramTrie":
+        """Counts every order up to ``max_order`` over an iterable of words (or corpus lines)."""
+        kept = []
+        for line in words:
+            word = line.strip().lower()
+            if word:
+                kept.append(word)
+        return cls._count(kept, max_order)
+
+    @classmethod
+    def from_corpus(cls, corpus_path: str, max_order: int = DEFAULT_MAX_ORDER) -> "NgramTrie":
+        """Reads a corpus file (one word per line) once and counts every order up to ``max_order``."""
+        with utils.open_any(corpus_path) as f:
+            return cls.from_words(f, max_order)
+
+    @classmethod
+    def _count(cls, words: list[str], max_order: int) -> "NgramTrie":
+        if max_order < 2:
+            raise ValueError("max_order must be at least 2")
+        depth = max_order - 1
+        alphabet = _alphabet({c for word in words for c in word}, max_order)
+        base = len(alphabet)
+
+        lookup = np.zeros(max(map(ord, alphabet)) + 1, dtype=np.int64)
+        lookup[[ord(c) for c in alphabet]] = np.arange(base)
+        text = "".join(_PAD * depth + word + _END for word in words)
+        symbols = lookup[np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)]
+
+        # Every non-padding position is an observation of its successor
+        # symbol; its length-k prefix code gains one more leading digit per
+        # level, and never reaches back into the previous word's padding.
+        positions = np.flatnonzero(symbols != alphabet.index(_PAD))
+        successors = symbols[positions]
+        codes = np.zeros(len(positions), dtype=np.int64)
+        levels = []
+        for k in range(depth + 1):
+            if k:
+                codes = codes + symbols[positions - k] * base ** (k - 1)
+            keys, counts = np.unique(codes * base + successors, return_counts=True)
+            levels.append(_level(keys, counts.astype(np.float64), base))
+        return cls(alphabet, max_order, levels, Counter(words))
+
+    def add_words(self, words) -> int:
+        """
+        Adds words (one occurrence each, as if appended to the corpus) to the
+        counts of every order and to the corpus word set.
+
+        Returns:
+            The number of words added.
+        """
+        delta = NgramTrie.from_words(words, self.max_order)
+        self._merge(delta, 1)
+        self.word_counts.update(delta.word_counts)
+        return delta.word_counts.total()
+
+    def remove_words(self, words) -> int:
+        """
+        Removes every occurrence of the given words from the counts of every
+        order and from the corpus word set. Words not in the corpus are
+        ignored.
+
+        Returns:
+            The number of distinct words removed.
+        """
+        present = {w for w in (line.strip().lower() for line in words) if self.word_counts.get(w)}
+        occurrences = [w for w in sorted(present) for _ in range(self.word_counts[w])]
+        self._merge(NgramTrie.from_words(occurrences, self.max_order), -1)
+        for word in present:
+            del self.word_counts[word]
+        return len(present)
+
+    def _merge(self, delta: "NgramTrie", sign: int) -> None:
+        """Adds (or with ``sign=-1`` subtracts) another trie's counts, level by level."""
+        self.alphabet, self.levels = _combine([(self, 1), (delta, sign)], self.max_order)
+
+    @classmethod
+    def blend(cls, weighted: list[tuple["NgramTrie", float]]) -> "NgramTrie":
+        """
+        Merges the tries of several corpora into one, scaling each corpus's
+        counts so that its share of all observations matches its share of
+        the total weight. The blend keeps the combined corpus size, so
+        smoothing sees counts of the usual magnitude, and its corpus word
+        set is the union of theirs.
+
+        Args:
+            weighted: (trie, weight) pairs; weights must be positive.
+
+        Returns:
+            A trie up to the smallest ``max_order`` among the inputs, or
+            lower if their combined alphabet only fits fewer orders.
+        """
+        if not weighted:
+            raise ValueError("nothing to blend")
+        if any(weight <= 0 for _, weight in weighted):
+            raise ValueError("blend weights must be positive")
+        sizes = [trie.levels[0][3].sum() for trie, _ in weighted]
+        total_size = sum(sizes)
+        total_weight = sum(weight for trie, weight in weighted)
+        parts = [(trie, weight / total_weight * total_size / size)
+                 for (trie, weight), size in zip(weighted, sizes) if size]
+        max_order = min(trie.max_order for trie, _ in weighted)
+        word_counts = Counter()
+        for trie, _ in weighted:
+            word_counts.update(trie.word_counts)
+        if not parts:
+            return cls._count([], max_order)
+        try:
+            alphabet, levels = _combine(parts, max_order)
+        except AlphabetTooLarge as e:
+            # The corpora's alphabets together only fit fewer orders.
+            max_order = e.max_order
+            alphabet, levels = _combine(parts, max_order)
+        return cls(alphabet, max_order, levels, word_counts)
+
+    def _decode(self, codes: np.ndarray, k: int) -> list[str]:
+        """Turns level-``k`` prefix codes back into strings."""
+        if k == 0:
+            return [""] * len(codes)
+        base = len(self.alphabet)
+        digits = (codes[:, None] // base ** np.arange(k - 1, -1, -1)) % base
+        glyphs = np.array(list(self.alphabet), dtype="<U1")
+        return glyphs[digits].view(f"<U{k}")[:, 0].tolist()
+
+    def _parents(self, k: int) -> np.ndarray:
+        """Index, in level ``k - 1``, of each level-``k`` prefix's one-shorter suffix."""
+        return np.searchsorted(self.levels[k - 1][0], self.levels[k][0] % len(self.alphabet) ** (k - 1))
+
+    def counts(self, n: int) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the order-``n`` table as (prefixes, indptr, successor symbols, counts)."""
+        self._check(n)
+        prefixes, indptr, successors, counts = self.levels[n - 1]
+        return self._decode(prefixes, n - 1), indptr, successors, counts
+
+    def _smoothed(self, n: int) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Witten-Bell interpolated (indptr, successors, probs) tables for levels
+        1 to n-1: each prefix blends its own counts with its suffix's
+        smoothed distribution, weighted by its number of distinct successors.
+        """
+        base = len(self.alphabet)
+        _, indptr, successors, counts = self.levels[1]
+        totals = np.add.reduceat(counts, indptr[:-1])
+        tables = [None, (indptr, successors, counts / np.repeat(totals, np.diff(indptr)))]
+        for k in range(2, n):
+            _, indptr, successors, counts = self.levels[k]
+            lower_indptr, lower_successors, lower_probs = tables[k - 1]
+            parents = self._parents(k)
+            distinct = np.diff(indptr)
+            totals = np.add.reduceat(counts, indptr[:-1])
+            denominators = totals + distinct
+
+            # Each prefix inherits its parent's whole smoothed row...
+            widths = lower_indptr[parents + 1] - lower_indptr[parents]
+            inherited = np.arange(widths.sum()) + np.repeat(lower_indptr[parents] - (np.cumsum(widths) - widths), widths)
+            rows = np.repeat(np.arange(len(parents)), widths)
+            inherited_probs = lower_probs[inherited] * np.repeat(distinct / denominators, widths)
+            # ...plus its own counts.
+            own_rows = np.repeat(np.arange(len(parents)), distinct)
+            own_probs = counts / np.repeat(denominators, distinct)
+
+            keys = np.concatenate((rows * base + lower_successors[inherited], own_rows * base + successors))
+            merged, inverse = np.unique(keys, return_inverse=True)
+            probs = np.bincount(inverse, weights=np.concatenate((inherited_probs, own_probs)))
+            merged_rows = merged // base
+            merged_indptr = np.searchsorted(merged_rows, np.arange(len(parents) + 1))
+            tables.append((merged_indptr, (merged % base).astype(np.int32), probs))
+        return tables
+
+    def model(self, n: int, backoff: bool = False) -> CompactModel:
+        """
+        Derives an order-``n`` CompactModel without touching the corpus:
+        exact n-gram counts, or with ``backoff=True`` the Witten-Bell
+        interpolation over orders n down to 2 (see generator.train_backoff).
+        """
+        self._check(n)
+        if not backoff:
+            _, indptr, successors, counts = self.levels[n - 1]
+            return _compact(n, self._decode(self.levels[n - 1][0], n - 1), indptr, successors, counts, self.alphabet)
+        table = {}
+        for k, (indptr, successors, probs) in enumerate(self._smoothed(n)[1:], start=1):
+            prefixes = self._decode(self.levels[k][0], k)
+            table.update(_compact(n, prefixes, indptr, successors, probs, self.alphabet)._table)
+        return CompactModel(n, table)
+
+    def _check(self, n: int) -> None:
+        if not 1 <= n <= self.max_order:
+            raise ValueError(f"order {n} is outside the indexed range 1..{self.max_order}")
+
+def _alphabet(chars: set, max_order: int) -> str:
+    """The sorted symbol alphabet for a set of corpus characters."""
+    alphabet = "".join(sorted(chars | {_PAD, _END}))
+    if len(alphabet) ** max_order >= 2 ** 63:
+        fits = max_order - 1
+        while len(alphabet) ** fits >= 2 ** 63:
+            fits -= 1
+        raise AlphabetTooLarge(len(alphabet), max_order, fits)
+    return alphabet
+
+def _combine(parts: list[tuple["NgramTrie", float]], max_order: int) -> tuple[str, list[tuple]]:
+    """Sums the scaled counts of several tries into one (alphabet, levels) pair."""
+    alphabet = _alphabet(set().union(*(trie.alphabet for trie, _ in parts)), max_order)
+    base = len(alphabet)
+    levels = []
+    for k in range(max_order):
+        keys = np.concatenate([_keys(trie.levels[k], k, trie.alphabet, alphabet) for trie, _ in parts])
+        counts = np.concatenate([scale * trie.levels[k][3] for trie, scale in parts])
+        merged, inverse = np.unique(keys, return_inverse=True)
+        totals = np.bincount(inverse, weights=counts, minlength=len(merged))
+        kept = totals > 1e-9  # drop successors whose count was removed entirely
+        levels.append(_level(merged[kept], totals[kept], base))
+    return alphabet, levels
+
+def _level(keys: np.ndarray, counts: np.ndarray, base: int) -> tuple:
+    """Splits sorted ``prefix * base + successor`` keys into a CSR level."""
+    prefixes, starts = np.unique(keys // base, return_index=True)
+    indptr = np.append(starts, len(keys))
+    return prefixes, indptr, (keys % base).astype(np.int32), counts
+
+def _keys(level: tuple, k: int, alphabet: str, target: str) -> np.ndarray:
+    """Re-encodes a level's ``prefix * base + successor`` keys in a larger alphabet."""
+    prefixes, indptr, successors, _ = level
+    base, new_base = len(alphabet), len(target)
+    recode = np.array([target.index(c) for c in alphabet], dtype=np.int64)
+    places = np.arange(k - 1, -1, -1)
+    digits = (prefixes[:, None] // base ** places) % base
+    codes = (recode[digits] * new_base ** places).sum(axis=1)
+    return np.repeat(codes, np.diff(indptr)) * new_base + recode[successors]
+
+def _compact(n: int, prefixes: list[str], indptr: np.ndarray, successors: np.ndarray,
+             weights: np.ndarray, alphabet: str) -> CompactModel:
+    """Builds a CompactModel from a CSR table whose rows are sorted by symbol."""
+    chars = np.array(list(alphabet), dtype="<U1")[successors]
+    cumulative = np.cumsum(weights)
+    offsets = np.concatenate(([0.0], cumulative))[indptr[:-1]]
+    cumulative = cumulative - np.repeat(offsets, np.diff(indptr))
+    table = {}
+    for i, prefix in enumerate(prefixes):
+        start, end = indptr[i], indptr[i + 1]
+        row = array("d")
+        row.frombytes(cumulative[start:end].tobytes())
+        table[prefix] = ("".join(chars[start:end]), row)
+    return CompactModel(n, table)
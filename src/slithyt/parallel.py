@@ -0,0 +1,239 @@
+"""slithyt.parallel — fan word generation out over a process pool.
+
+Generation is split into fixed-size chunks of candidates. Chunk ``i`` draws
+from its own RNG stream, derived from ``(seed, i)`` with NumPy's
+``SeedSequence``, and validates its candidates independently. The parent
+merges chunk results strictly in chunk order with a global dedup, so the
+words produced for a given ``seed`` are the same whether one process or
+many did the work. Each worker receives the job (model, validation sets)
+once, through the pool initializer, rather than with every chunk.
+
+``score`` spreads the validation and scoring of a long word list (e.g.
+``slithyt validate --input``) over a pool the same way, yielding a record
+per word in input order.
+"""
+
+from __future__ import annotations
+
+import itertools
+import math
+import random
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+
+from . import generator, pronounce, rhyme, sentiment, validator
+
+# Candidates generated per chunk. Output for a given seed depends on this,
+# so it must not vary with the number of workers.
+CHUNK_SIZE = 256
+# Words per chunk handed to a worker by ``score``; a list of fewer words is
+# scored in this process.
+SCORE_CHUNK_SIZE = 1024
+
+
+@dataclass
+class CorpusJob:
+    """Generates candidates from a compiled (and possibly constrained) corpus
+    model, steering away from ending on the words in ``avoid``."""
+    model: generator.CompiledModel
+    min_len: int
+    max_len: int
+    avoid: generator.WordTrie | None = None
+
+    def candidates(self, seed: np.random.SeedSequence, size: int) -> list[str]:
+        return generator.generate_batch(self.model, size, self.min_len, self.max_len,
+                                        rng=np.random.default_rng(seed), avoid=self.avoid)
+
+
+@dataclass
+class RhymeJob:
+    """Generates candidates that end with a rhyme signature."""
+    phonetic_model: dict
+    transcription_model: dict
+    signature: list[str]
+
+    def candidates(self, seed: np.random.SeedSequence, size: int) -> list[str]:
+        rng = random.Random(int(seed.generate_state(1)[0]))
+        words = []
+        for _ in range(size):
+            phonemes = rhyme.generate_phonetic_word(self.phonetic_model, self.signature, rng=rng)
+            if phonemes:
+                words.append(rhyme.transcribe_word(self.transcription_model, phonemes, rng=rng))
+        return words
+
+
+def _run_chunk(context: tuple, index: int) -> list[str]:
+    """Generate one chunk of candidates and return the valid ones, in order."""
+    job, constraints, seed, size = context
+    stream = np.random.SeedSequence(seed, spawn_key=(index,))
+    seen = set()
+    valid = []
+    for word in job.candidates(stream, size):
+        if word and word not in seen and constraints.validate(word):
+            seen.add(word)
+            valid.append(word)
+    return valid
+
+
+_worker_context = None
+
+
+def _init_worker(context: tuple) -> None:
+    global _worker_context
+    _worker_context = context
+
+
+def _worker_chunk(index: int) -> list[str]:
+    return _run_chunk(_worker_context, index)
+
+
+def _pooled_chunks(pool: ProcessPoolExecutor, chunks: Iterable, window: int, work=_worker_chunk) -> Iterator[list]:
+    """Yield chunk results in chunk order, keeping ``window`` chunks in flight."""
+    chunks = iter(chunks)
+    pending = deque(pool.submit(work, chunk) for chunk in itertools.islice(chunks, window))
+    while pending:
+        result = pending.popleft().result()
+        pending.extend(pool.submit(work, chunk) for chunk in itertools.islice(chunks, 1))
+        yield result
+
+
+def _merge(results: Iterable[list[str]], count: int | None, seen, patience: int | None) -> Iterator[list[str]]:
+    """Yield the new words of each chunk (possibly none), in chunk order."""
+    produced = idle = 0
+    for words in results:
+        new = []
+        for word in words:
+            if count is not None and produced >= count:
+                break
+            if word not in seen:
+                seen.add(word)
+                produced += 1
+                new.append(word)
+        yield new
+        if count is not None and produced >= count:
+            return
+        idle = 0 if new else idle + 1
+        if patience is not None and idle >= patience:
+            return
+
+
+def generate_chunks(
+    job: CorpusJob | RhymeJob,
+    constraints: validator.Constraints,
+    count: int | None,
+    *,
+    jobs: int = 1,
+    seed: int | None = None,
+    max_candidates: int | None = None,
+    seen=None,
+    patience: int | None = None,
+) -> Iterator[list[str]]:
+    """Like ``generate``, but yield the new words chunk by chunk, including
+    an empty list for a chunk that found none, so a consumer can act (e.g.
+    flush output) at chunk boundaries even while words are scarce.
+
+    Args:
+        patience: Stop after this many consecutive chunks without a new
+            word, i.e. once the job seems to have run out of novel words;
+            None never gives up.
+    """
+    seen = seen if seen is not None else set()
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    context = (job, constraints, seed, CHUNK_SIZE)
+    if max_candidates is None:
+        chunks = itertools.count()
+    else:
+        chunks = range(math.ceil(max_candidates / CHUNK_SIZE))
+
+    if jobs <= 1:
+        yield from _merge((_run_chunk(context, i) for i in chunks), count, seen, patience)
+        return
+
+    pool = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(context,))
+    try:
+        yield from _merge(_pooled_chunks(pool, chunks, jobs * 2), count, seen, patience)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def generate(
+    job: CorpusJob | RhymeJob,
+    constraints: validator.Constraints,
+    count: int | None,
+    *,
+    jobs: int = 1,
+    seed: int | None = None,
+    max_candidates: int | None = None,
+    seen=None,
+    patience: int | None = None,
+) -> Iterator[str]:
+    """Yield up to ``count`` unique words that pass ``constraints``.
+
+    Args:
+        job: What to generate candidates from.
+        constraints: The checks every word must pass.
+        count: How many unique words to yield; None streams without end.
+        jobs: Worker processes to use; 1 generates in this process.
+        seed: Base seed; the same seed yields the same words for any ``jobs``.
+        max_candidates: Give up after roughly this many candidates.
+        seen: The container used for dedup (anything supporting ``in`` and
+            ``add``, e.g. a ``bloom.BloomFilter`` for very long streams);
+            a fresh set by default. Words already in it are never yielded.
+        patience: Give up after this many consecutive chunks of
+            ``CHUNK_SIZE`` candidates without a new word; None never does.
+    """
+    for words in generate_chunks(job, constraints, count, jobs=jobs, seed=seed,
+                                 max_candidates=max_candidates, seen=seen, patience=patience):
+        yield from words
+
+
+def _score_chunk(constraints: validator.Constraints, words: list[str]) -> list[dict]:
+    sentiments = sentiment.score_many(words).tolist()
+    pronounceabilities = pronounce.score_many(words).tolist()
+    return [
+        {
+            "word": word,
+            "valid": constraints.validate(word),
+            "sentiment": score,
+            "pronounceability": pronounceability,
+        }
+        for word, score, pronounceability in zip(words, sentiments, pronounceabilities)
+    ]
+
+
+def _worker_score(words: list[str]) -> list[dict]:
+    return _score_chunk(_worker_context, words)
+
+
+def _batches(words: Iterable[str], size: int) -> Iterator[list[str]]:
+    words = iter(words)
+    while batch := list(itertools.islice(words, size)):
+        yield batch
+
+
+def score(words: Iterable[str], constraints: validator.Constraints, *, jobs: int = 1) -> Iterator[dict]:
+    """Yield ``{"word", "valid", "sentiment", "pronounceability"}`` for each
+    of ``words``, in order, reading them lazily.
+
+    Lists longer than ``SCORE_CHUNK_SIZE`` are scored by ``jobs`` worker
+    processes, each handed ``constraints`` once; shorter ones (or
+    ``jobs=1``) in this process.
+    """
+    batches = _batches(words, SCORE_CHUNK_SIZE)
+    head = list(itertools.islice(batches, 2))
+    if jobs <= 1 or len(head) < 2:
+        for batch in itertools.chain(head, batches):
+            yield from _score_chunk(constraints, batch)
+        return
+
+    pool = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(constraints,))
+    try:
+        for records in _pooled_chunks(pool, itertools.chain(head, batches), jobs * 2, _worker_score):
+            yield from records
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,346 @@
+# src/slithyt/pattern.py
+#
+# Compiles a practical subset of Python regex syntax to a DFA over a model's
+# alphabet, and intersects that DFA with a compiled n-gram model so that
+# generation only makes moves that can still satisfy the pattern.
+
+import re
+from dataclasses import dataclass
+import numpy as np
+from .generator import CompiledModel
+
+# NFA/DFA symbols: alphabet indexes, with 0 doubling as the end of the word
+# (the model's end marker), plus a start-of-word symbol that is consumed
+# once, before the first character. Anchors match these two symbols, so
+# unanchored re.search() semantics need no special casing.
+_BOS = -1
+_EOS = 0
+
+# Limits that keep compilation cheap; patterns exceeding them fall back to
+# filtering after generation.
+MAX_NFA_STATES = 5000
+MAX_DFA_STATES = 2000
+
+class UnsupportedPattern(ValueError):
+    """Raised when a regex uses syntax outside the DFA-compilable subset."""
+
+@dataclass
+class DFA:
+    """
+    A complete DFA over a model's alphabet with re.search() semantics.
+
+    ``transitions[d, symbol]`` is the next state; ``start`` is the state
+    after the start-of-word symbol; ``accept`` is the absorbing state that
+    means the pattern has matched; ``live[d]`` is whether ``accept`` is still
+    reachable from ``d``.
+    """
+    transitions: np.ndarray
+    start: int
+    accept: int
+    live: np.ndarray
+
+class _Parser:
+    """A recursive-descent parser producing a small regex syntax tree."""
+
+    _QUANTIFIER = re.compile(r"\{(\d*)(,?)(\d*)\}")
+
+    def __init__(self, pattern: str, alphabet: str):
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.i = 0
+
+    def parse(self):
+        node = self._alternation()
+        if self.i != len(self.pattern):
+            raise UnsupportedPattern(f"unexpected {self.pattern[self.i]!r}")
+        return node
+
+    def _peek(self) -> str:
+        return self.pattern[self.i] if self.i < len(self.pattern) else ""
+
+    def _alternation(self):
+        branches = [self._concatenation()]
+        while self._peek() == "|":
+            self.i += 1
+            branches.append(self._concatenation())
+        return ("alt", branches) if len(branches) > 1 else branches[0]
+
+    def _concatenation(self):
+        items = []
+        while self._peek() not in ("", "|", ")"):
+            items.append(self._repetition())
+        return ("cat", items)
+
+    def _repetition(self):
+        node = self._atom()
+        while True:
+            c = self._peek()
+            if c in ("*", "+", "?"):
+                self.i += 1
+                low, high = {"*": (0, None), "+": (1, None), "?": (0, 1)}[c]
+            elif c == "{" and (m := self._QUANTIFIER.match(self.pattern, self.i)) and (m[1] or m[3]):
+                self.i = m.end()
+                low = int(m[1]) if m[1] else 0
+                high = None if m[2] and not m[3] else int(m[3] or m[1])
+            else:
+                return node
+            if self._peek() == "?":
+                self.i += 1  # lazy quantifiers match the same set of words
+            elif self._peek() == "+":
+                raise UnsupportedPattern("possessive quantifiers")
+            node = ("rep", node, low, high)
+
+    def _atom(self):
+        c = self._peek()
+        if c == "(":
+            if self.pattern.startswith("(?:", self.i):
+                self.i += 3
+            elif self.pattern.startswith("(?P<", self.i):
+                self.i = self.pattern.index(">", self.i) + 1
+            elif self.pattern.startswith("(?", self.i):
+                raise UnsupportedPattern("lookarounds, flags and conditionals")
+            else:
+                self.i += 1
+            node = self._alternation()
+            if self._peek() != ")":
+                raise UnsupportedPattern("unbalanced group")
+            self.i += 1
+            return node
+        if c == "^":
+            self.i += 1
+            return ("sym", frozenset([_BOS]))
+        if c == "$":
+            self.i += 1
+            return ("sym", frozenset([_EOS]))
+        if c == "[":
+            end = self.i + 1
+            if self.pattern.startswith("^", end):
+                end += 1
+            if self.pattern.startswith("]", end):
+                end += 1
+            while end < len(self.pattern) and self.pattern[end] != "]":
+                end += 2 if self.pattern[end] == "\\" else 1
+            text = self.pattern[self.i:end + 1]
+            self.i = end + 1
+            return ("sym", self._matching(text))
+        if c == "\\":
+            escaped = self.pattern[self.i + 1:self.i + 2]
+            if escaped == "A":
+                self.i += 2
+                return ("sym", frozenset([_BOS]))
+            if escaped == "Z":
+                self.i += 2
+                return ("sym", frozenset([_EOS]))
+            if escaped.isdigit() or escaped in ("b", "B", "g"):
+                raise UnsupportedPattern("backreferences and word boundaries")
+            if escaped == "N" and self.pattern.startswith("{", self.i + 2):
+                width = self.pattern.find("}", self.i) + 1 - self.i
+            else:
+                width = {"x": 4, "u": 6, "U": 10}.get(escaped, 2)
+            text = self.pattern[self.i:self.i + width]
+            self.i += width
+            return ("sym", self._matching(text))
+        self.i += 1
+        return ("sym", self._matching(c))
+
+    def _matching(self, text: str) -> frozenset:
+        """Returns the alphabet symbols a single-character atom matches."""
+        try:
+            atom = re.compile(text, re.IGNORECASE)
+        except re.error:
+            # The whole pattern compiled, so this is an atom mis-sized above.
+            raise UnsupportedPattern(f"cannot isolate {text!r}") from None
+        return frozenset(i for i, c in enumerate(self.alphabet) if i != _EOS and atom.fullmatch(c))
+
+class _NFA:
+    """A Thompson NFA with epsilon moves."""
+
+    def __init__(self):
+        self.epsilon = []
+        self.moves = []
+
+    def state(self) -> int:
+        if len(self.moves) >= MAX_NFA_STATES:
+            raise UnsupportedPattern("pattern is too large")
+        self.epsilon.append([])
+        self.moves.append([])
+        return len(self.moves) - 1
+
+    def build(self, node) -> tuple[int, int]:
+        kind = node[0]
+        if kind == "sym":
+            start, end = self.state(), self.state()
+            self.moves[start].append((node[1], end))
+            return start, end
+        if kind == "cat":
+            start = end = self.state()
+            for item in node[1]:
+                item_start, item_end = self.build(item)
+                self.epsilon[end].append(item_start)
+                end = item_end
+            return start, end
+        if kind == "alt":
+            start, end = self.state(), self.state()
+            for branch in node[1]:
+                branch_start, branch_end = self.build(branch)
+                self.epsilon[start].append(branch_start)
+                self.epsilon[branch_end].append(end)
+            return start, end
+        _, item, low, high = node
+        start = end = self.state()
+        for _ in range(low):
+            item_start, item_end = self.build(item)
+            self.epsilon[end].append(item_start)
+            end = item_end
+        if high is None:
+            item_start, item_end = self.build(item)
+            loop_end = self.state()
+            self.epsilon[end] += [item_start, loop_end]
+            self.epsilon[item_end] += [item_start, loop_end]
+            return start, loop_end
+        final = self.state()
+        for _ in range(high - low):
+            item_start, item_end = self.build(item)
+            self.epsilon[end] += [item_start, final]
+            end = item_end
+        self.epsilon[end].append(final)
+        return start, final
+
+    def closure(self, states) -> frozenset:
+        stack = list(states)
+        seen = set(stack)
+        while stack:
+            for target in self.epsilon[stack.pop()]:
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return frozenset(seen)
+
+def compile_dfa(pattern: str, alphabet: str) -> DFA:
+    """
+    Compiles a regex to a DFA over ``alphabet`` (whose index 0 is the end
+    marker) that accepts exactly the words ``re.search(pattern, word,
+    re.IGNORECASE)`` matches.
+
+    Supported: literals and escapes, ``.``, character classes, groups,
+    ``|``, ``* + ? {m,n}`` (greedy or lazy) and the ``^``/``$`` anchors.
+
+    Raises:
+        re.error: If the pattern is not a valid regex.
+        UnsupportedPattern: If it uses syntax outside the subset.
+    """
+    re.compile(pattern)
+    nfa = _NFA()
+    start, final = nfa.build(_Parser(pattern, alphabet).parse())
+    restart = nfa.closure([start])
+
+    subsets = {}
+    rows = []
+    ACCEPT = "accept"
+
+    def state_of(subset) -> int:
+        key = ACCEPT if final in subset else subset
+        if key not in subsets:
+            if len(subsets) >= MAX_DFA_STATES:
+                raise UnsupportedPattern("pattern needs too many DFA states")
+            subsets[key] = len(subsets)
+            rows.append(key)
+        return subsets[key]
+
+    def step(subset, symbol) -> frozenset:
+        moved = [target for s in subset for symbols, target in nfa.moves[s] if symbol in symbols]
+        # Re-adding the start closure lets a match begin at any position.
+        return nfa.closure(moved) | restart
+
+    begin = state_of(step(restart, _BOS))
+    accept = state_of(frozenset([final]))
+    table = []
+    i = 0
+    while i < len(rows):
+        key = rows[i]
+        if key == ACCEPT:
+            table.append([i] * len(alphabet))
+        else:
+            table.append([state_of(step(key, symbol)) for symbol in range(len(alphabet))])
+        i += 1
+
+    transitions = np.array(table, dtype=np.int64)
+    live = np.zeros(len(rows), dtype=bool)
+    live[accept] = True
+    while True:
+        grown = live | live[transitions].any(axis=1)
+        if (grown == live).all():
+            break
+        live = grown
+    return DFA(transitions, begin, accept, live)
+
+def _constant_dfa(alphabet: str, accepting: bool) -> DFA:
+    """A one-state DFA that accepts every word, or none."""
+    transitions = np.zeros((1, len(alphabet)), dtype=np.int64)
+    return DFA(transitions, 0, 0 if accepting else -1, np.array([accepting]))
+
+def constrain(model: CompiledModel, matches_regex: str = None, reject_regex: str = None) -> CompiledModel | None:
+    """
+    Intersects a compiled model with regex constraints.
+
+    The result is a CompiledModel whose states are (prefix, match-DFA,
+    reject-DFA) triples reachable from the start. Transitions that can no
+    longer lead to a word matching ``matches_regex`` and not matching
+    ``reject_regex`` are dropped, and so are end markers that would finish
+    a word failing either pattern. Surviving transitions keep their
+    original probabilities, so length-aware generation from the product
+    samples words from the model conditioned on the constraints.
+
+    Returns:
+        The constrained model, or None if either pattern is outside the
+        supported subset and must be applied as a filter instead.
+
+    Raises:
+        re.error: If either pattern is not a valid regex.
+    """
+    try:
+        match = compile_dfa(matches_regex, model.alphabet) if matches_regex else _constant_dfa(model.alphabet, True)
+        reject = compile_dfa(reject_regex, model.alphabet) if reject_regex else _constant_dfa(model.alphabet, False)
+    except UnsupportedPattern:
+        return None
+
+    d1, d2 = len(match.transitions), len(reject.transitions)
+    start = (model.start * d1 + match.start) * d2 + reject.start
+    seen = np.array([start], dtype=np.int64)
+    frontier = seen
+    if not match.live[match.start] or reject.start == reject.accept:
+        frontier = frontier[:0]
+    parts = []
+    while frontier.size:
+        states, rest = np.divmod(frontier, d1 * d2)
+        m, r = np.divmod(rest, d2)
+        counts = model.indptr[states + 1] - model.indptr[states]
+        firsts = np.repeat(model.indptr[states] - (np.cumsum(counts) - counts), counts)
+        edges = np.arange(counts.sum()) + firsts
+        symbols = model.symbols[edges]
+        dests = model.dests[edges]
+        next_m = match.transitions[np.repeat(m, counts), symbols]
+        next_r = reject.transitions[np.repeat(r, counts), symbols]
+        ends = symbols == _EOS
+        ok_end = ends & (next_m == match.accept) & (next_r != reject.accept)
+        ok_step = ~ends & (dests >= 0) & match.live[next_m] & (next_r != reject.accept)
+        keep = ok_end | ok_step
+        targets = np.where(ok_step, (dests * d1 + next_m) * d2 + next_r, -1)
+        parts.append((np.repeat(frontier, counts)[keep], symbols[keep], model.probs[edges][keep], targets[keep]))
+        frontier = np.unique(targets[ok_step])
+        frontier = frontier[~np.isin(frontier, seen)]
+        seen = np.concatenate((seen, frontier))
+
+    sources = np.concatenate([p[0] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+    symbols = np.concatenate([p[1] for p in parts]) if parts else np.zeros(0, dtype=np.int32)
+    probs = np.concatenate([p[2] for p in parts]) if parts else np.zeros(0)
+    targets = np.concatenate([p[3] for p in parts]) if parts else np.zeros(0, dtype=np.int64)
+
+    sorter = np.argsort(seen)
+    rows = sorter[np.searchsorted(seen, sources, sorter=sorter)]
+    dests = np.where(targets >= 0, sorter[np.searchsorted(seen, np.maximum(targets, 0), sorter=sorter)], -1)
+    order = np.argsort(rows, kind="stable")
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(seen)))))
+    prefixes = [model.prefixes[s] for s in (seen // (d1 * d2)).tolist()]
+    return CompiledModel(model.n, model.alphabet, prefixes, indptr,
+                         symbols[order], probs[order], dests[order])
@@ -0,0 +1,106 @@
+"""slithyt.phonetic — reject words that sound like a known word.
+
+"Kleenecks" is not in any dictionary, but it is still "Kleenex". A word's
+``sound_key`` is a rough, English-centric phonetic spelling computed from
+its letters alone, since generated words have no entry in a pronouncing
+dictionary: silent letters are dropped, spellings of the same consonant
+sound ("ph"/"f", "ck"/"k", soft "c"/"s") are merged, and common vowel
+spellings are reduced to a short or long vowel ("lite" and "light" both
+become ``"lIt"``). Unlike Soundex or Metaphone it keeps the vowels, so it
+only equates words that are pronounced alike, not merely similar ones.
+
+A ``SoundIndex`` holds the keys of a word list in a ``wordindex.WordIndex``,
+so checking a candidate is one key computation and one hash lookup.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable
+
+from . import wordindex
+
+VERSION = 1
+
+_NON_LETTER_RE = re.compile("[^a-z]")
+_INITIAL = {"kn": "n", "gn": "n", "pn": "n", "wr": "r", "ps": "s", "gh": "g", "x": "z"}
+_INITIAL_RE = re.compile("^(?:" + "|".join(sorted(_INITIAL, key=len, reverse=True)) + ")")
+
+# Tried in order at each position, so longer spellings come first. Capitals
+# stand for sounds without a letter of their own: C (ch), S (sh), T (th),
+# Y (oy) and the long vowels A, E, I, O, U.
+_GRAPHEMES = [
+    ("tch", "C"), ("sch", "sk"), ("igh", "I"),
+    ("ch", "C"), ("sh", "S"), ("th", "T"), ("ph", "f"), ("gh", ""), ("ck", "k"),
+    ("wh", "w"), ("qu", "kw"), ("dg", "j"),
+    ("ee", "E"), ("ea", "E"), ("ie", "E"), ("ei", "E"),
+    ("ey(?![aeiou])", "E"), ("ai", "A"), ("ay", "A"),
+    ("oa", "O"), ("oe", "O"), ("ow", "O"),
+    ("oo", "U"), ("ou", "U"), ("ue", "U"), ("ew", "U"),
+    ("au", "o"), ("aw", "o"), ("oi", "Y"), ("oy", "Y"),
+    ("c(?=[eiy])", "s"), ("g(?=[eiy])", "j"),
+    ("c", "k"), ("q", "k"), ("x", "ks"), ("z", "s"),
+]
+_GRAPHEME_RE = re.compile("|".join(f"({pattern})" for pattern, _ in _GRAPHEMES))
+_REPLACEMENTS = [replacement for _, replacement in _GRAPHEMES]
+
+# A final "e" after one consonant lengthens the vowel before it ("lite");
+# any other final "e" after a consonant is silent ("humble" sounds like
+# "humbel").
+_MAGIC_E_RE = re.compile(r"([aeiouy])([b-df-hj-np-tv-zCST])e$")
+_LONG = {"a": "A", "e": "E", "i": "I", "o": "O", "u": "U", "y": "I"}
+_FINAL_LE_RE = re.compile(r"(?<=[^aeiouyAEIOUY])le$")
+_SILENT_E_RE = re.compile(r"(?<=.[^aeiouyAEIOUY])e$")
+# "y" not before a vowel is one: a long "i" when it is the only vowel
+# ("fly"), "ee" at the end of a longer word ("candy"), short "i" elsewhere.
+_VOWEL_RE = re.compile("[aeiouAEIOUY]")
+_VOWEL_Y_RE = re.compile(r"y(?![aeiouAEIOUY])")
+_REPEAT_RE = re.compile(r"(.)\1+")
+
+
+def sound_key(word: str) -> str:
+    """A phonetic spelling of ``word``, equal for words pronounced alike."""
+    key = _NON_LETTER_RE.sub("", word.lower())
+    key = _INITIAL_RE.sub(lambda m: _INITIAL[m.group()], key)
+    key = _GRAPHEME_RE.sub(lambda m: _REPLACEMENTS[m.lastindex - 1], key)
+    key = _MAGIC_E_RE.sub(lambda m: _LONG[m.group(1)] + m.group(2), key)
+    key = _FINAL_LE_RE.sub("el", key)
+    key = _SILENT_E_RE.sub("", key)
+    if key.endswith("y"):
+        key = key[:-1] + ("E" if _VOWEL_RE.search(key, 0, len(key) - 1) else "I")
+    key = _VOWEL_Y_RE.sub("i", key)
+    return _REPEAT_RE.sub(r"\1", key)
+
+
+class SoundIndex:
+    """The sound keys of a word list; ``word in index`` is true when
+    ``word`` sounds like one of them."""
+
+    def __init__(self, keys: wordindex.WordIndex):
+        self.keys = keys
+
+    @classmethod
+    def open(cls, path) -> "SoundIndex":
+        """Memory-map a key index written by ``write``."""
+        return cls(wordindex.WordIndex.open(path))
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "SoundIndex":
+        """Build an index in memory, without a file."""
+        return cls(wordindex.WordIndex.from_words(_keys(words)))
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and sound_key(word) in self.keys
+
+    def __len__(self) -> int:
+        """The number of distinct sound keys."""
+        return len(self.keys)
+
+
+def _keys(words: Iterable[str]) -> set[str]:
+    return {key for key in map(sound_key, words) if key}
+
+
+def write(words: Iterable[str], path) -> None:
+    """Write the sound keys of ``words`` to ``path``, atomically."""
+    wordindex.write(_keys(words), path)
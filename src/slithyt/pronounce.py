@@ -1,10 +1,48 @@
 # slithyt/pronounce.py
 
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Character classes. Anything that is not one of these vowels, including
+# non-letters, counts as a consonant.
+_PAD, _CONSONANT, _VOWEL = 0, 1, 2
+_VOWELS = frozenset("aeiou")
+
+# Classes of the ASCII code points, for score_many(); every code point
+# above 127 is looked up as 127, a consonant.
+_CLASS_TABLE = bytes(_VOWEL if chr(code) in _VOWELS else _CONSONANT for code in range(128))
+
+def _score(length: int, max_consonant_cluster: int, max_vowel_cluster: int, num_vowels: int) -> float:
+    """Turns the measurements of a (non-empty) word into its score."""
+    # A cluster of more than 3 consonants is difficult.
+    consonant_penalty = max(0, max_consonant_cluster - 3) * 0.3
+
+    # A cluster of more than 2 vowels is uncommon.
+    vowel_penalty = max(0, max_vowel_cluster - 2) * 0.4
+
+    # Ideal vowel-to-consonant ratio (35%-65% vowels)
+    vowel_ratio = num_vowels / length
+    ratio_penalty = 0
+    if not (0.35 <= vowel_ratio <= 0.65):
+        ratio_penalty = 0.3
+
+    total_penalty = consonant_penalty + vowel_penalty + ratio_penalty
+    return max(0.0, 1.0 - total_penalty)
+
 def score_pronounceability(word: str) -> float:
     """
     Calculates a pronounceability score for a word based on heuristics.
     The score is between 0.0 (less pronounceable) and 1.0 (more pronounceable).
 
+    Long consonant clusters, long vowel clusters and a vowel ratio outside
+    35%-65% are penalized. All three are measured in one pass, as a state
+    machine whose state is the class of the current run and its length.
+
     Args:
         word: The word to score.
 
@@ -15,46 +53,61 @@ def score_pronounceability(word: str) -> float:
         return 0.0
 
     word_lower = word.lower()
-    vowels = "aeiou"
-    
-    # Heuristic 1: Penalize long consonant clusters
-    max_consonant_cluster = 0
-    current_consonant_cluster = 0
+    run = max_consonant_cluster = max_vowel_cluster = num_vowels = 0
+    in_vowels = False
     for char in word_lower:
-        if char not in vowels:
-            current_consonant_cluster += 1
-        else:
-            max_consonant_cluster = max(max_consonant_cluster, current_consonant_cluster)
-            current_consonant_cluster = 0
-    max_consonant_cluster = max(max_consonant_cluster, current_consonant_cluster)
-    
-    # A cluster of more than 3 consonants is difficult.
-    consonant_penalty = max(0, max_consonant_cluster - 3) * 0.3
+        is_vowel = char in _VOWELS
+        if is_vowel is not in_vowels:
+            in_vowels = is_vowel
+            run = 0
+        run += 1
+        if is_vowel:
+            num_vowels += 1
+            if run > max_vowel_cluster:
+                max_vowel_cluster = run
+        elif run > max_consonant_cluster:
+            max_consonant_cluster = run
+    return _score(len(word_lower), max_consonant_cluster, max_vowel_cluster, num_vowels)
 
-    # Heuristic 2: Penalize long vowel clusters
-    max_vowel_cluster = 0
-    current_vowel_cluster = 0
-    for char in word_lower:
-        if char in vowels:
-            current_vowel_cluster += 1
-        else:
-            max_vowel_cluster = max(max_vowel_cluster, current_vowel_cluster)
-            current_vowel_cluster = 0
-    max_vowel_cluster = max(max_vowel_cluster, current_vowel_cluster)
+def score_many(words: Iterable[str]) -> np.ndarray:
+    """
+    Scores many words at once, returning an array of what
+    score_pronounceability() gives for each.
 
-    # A cluster of more than 2 vowels is uncommon.
-    vowel_penalty = max(0, max_vowel_cluster - 2) * 0.4
+    The lowercased words become a padded matrix of character classes
+    (uint8, one row per word), and the same state machine then advances
+    every row together, one column at a time.
+    """
+    # NumPy is only needed to score words in bulk.
+    import numpy as np
 
-    # Heuristic 3: Ideal vowel-to-consonant ratio (35%-65% vowels)
-    num_vowels = sum(1 for char in word_lower if char in vowels)
-    vowel_ratio = num_vowels / len(word_lower) if len(word_lower) > 0 else 0
-    
-    ratio_penalty = 0
-    if not (0.35 <= vowel_ratio <= 0.65):
-        ratio_penalty = 0.3
+    lowered = [word.lower() for word in words]
+    lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered))
+    width = int(lengths.max()) if len(lowered) else 0
+    if width == 0:
+        return np.zeros(len(lowered))
 
-    # Calculate final score
-    total_penalty = consonant_penalty + vowel_penalty + ratio_penalty
-    score = max(0.0, 1.0 - total_penalty)
-    
-    return score
\ No newline at end of file
+    codes = np.array(lowered, dtype=f"<U{width}").view(np.uint32).reshape(len(lowered), width)
+    classes = np.frombuffer(_CLASS_TABLE, dtype=np.uint8)[np.minimum(codes, 127)]
+    classes[np.arange(width) >= lengths[:, None]] = _PAD
+
+    consonant_run = np.zeros(len(lowered), dtype=np.int64)
+    vowel_run = np.zeros(len(lowered), dtype=np.int64)
+    max_consonant_cluster = np.zeros(len(lowered), dtype=np.int64)
+    max_vowel_cluster = np.zeros(len(lowered), dtype=np.int64)
+    for column in classes.T:
+        consonant_run = np.where(column == _CONSONANT, consonant_run + 1, 0)
+        vowel_run = np.where(column == _VOWEL, vowel_run + 1, 0)
+        np.maximum(max_consonant_cluster, consonant_run, out=max_consonant_cluster)
+        np.maximum(max_vowel_cluster, vowel_run, out=max_vowel_cluster)
+    num_vowels = np.count_nonzero(classes == _VOWEL, axis=1)
+
+    # The same arithmetic as _score(), in the same order, so that every
+    # score is bit-for-bit equal.
+    consonant_penalty = np.maximum(0, max_consonant_cluster - 3) * 0.3
+    vowel_penalty = np.maximum(0, max_vowel_cluster - 2) * 0.4
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vowel_ratio = num_vowels / lengths
+    ratio_penalty = np.where((0.35 <= vowel_ratio) & (vowel_ratio <= 0.65), 0.0, 0.3)
+    scores = np.maximum(0.0, 1.0 - (consonant_penalty + vowel_penalty + ratio_penalty))
+    return np.where(lengths > 0, scores, 0.0)
@@ -55,7 +55,7 @@ def load_transcription_model(model_path: str) -> dict:
         print(f"Transcription model saved to {model_path}")
         return model
 
-def generate_phonetic_word(model: dict, rhyme_signature: list[str], n: int = 3) -> list[str] | None:
+def generate_phonetic_word(model: dict, rhyme_signature: list[str], n: int = 3, rng: random.Random = random) -> list[str] | None:
     """Generates a new sequence of phonemes that ends with the given rhyme signature."""
     if not model: return None
     prefix_len = n - 1
@@ -63,19 +63,19 @@ def generate_phonetic_word(model: dict, rhyme_signature: list[str], n: int = 3)
     generated_phonemes = []
     for _ in range(10):
         if current_prefix not in model: return None
-        next_phoneme = random.choice(model[current_prefix])
+        next_phoneme = rng.choice(model[current_prefix])
         if next_phoneme == "$": break
         generated_phonemes.append(next_phoneme)
         current_prefix = tuple(list(current_prefix[1:]) + [next_phoneme])
     return generated_phonemes + rhyme_signature
 
-def transcribe_word(transcription_model: dict, phonemes: list[str]) -> str:
+def transcribe_word(transcription_model: dict, phonemes: list[str], rng: random.Random = random) -> str:
     """Transcribes a sequence of phonemes into a plausible word spelling."""
     word = []
     for p in phonemes:
         base_phoneme = p.rstrip('012')
         if base_phoneme in transcription_model and transcription_model[base_phoneme]:
-            word.append(random.choice(transcription_model[base_phoneme]))
+            word.append(rng.choice(transcription_model[base_phoneme]))
         else:
             word.append('?')
     return "".join(word)
\ No newline at end of file
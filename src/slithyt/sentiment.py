@@ -1,7 +1,15 @@
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from __future__ import annotations
 
-# Initialize the analyzer for its word lexicon.
-_analyzer = SentimentIntensityAnalyzer()
+import marshal
+import re
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+from . import utils
+
+if TYPE_CHECKING:
+    import numpy as np
 
 # --- Structured Morpheme Lexicons ---
 
@@ -36,76 +44,143 @@ _INFIXES = {
     "bon": 2.5, "luc": 1.8, "lum": 1.8, "cred": 1.7,
 }
 
-_WORD_LEXICON = _analyzer.lexicon
+@lru_cache(maxsize=None)
+def _word_lexicon() -> dict[str, float]:
+    """
+    VADER's word lexicon (token -> valence, -4.0 to 4.0), loaded on first
+    use. It ships as a marshalled table extracted from vaderSentiment by
+    scripts/export_sentiment_lexicon.py, so vaderSentiment itself is not
+    needed at run time.
+    """
+    with open(utils.data_path("sentiment-lexicon.marshal"), "rb") as f:
+        return marshal.load(f)
+
+# Scores of the words (and stems) seen most recently; generation scores the
+# same stems over and over.
+MEMO_SIZE = 65536
+
+def _compile(morphemes) -> dict:
+    """
+    Compiles morphemes into a trie of nested dicts, keyed by character; the
+    key None marks the end of a morpheme and holds it.
+    """
+    root = {}
+    for morpheme in morphemes:
+        node = root
+        for char in morpheme:
+            node = node.setdefault(char, {})
+        node[None] = morpheme
+    return root
+
+# Matching walks a trie from the word start (prefixes), from the word end
+# (suffixes, stored reversed) or from each position (infixes), keeping the
+# longest morpheme passed. Morphemes too short to ever match are left out.
+_PREFIX_TRIE = _compile(p for p in _PREFIXES if len(p) >= 2)
+_SUFFIX_TRIE = _compile(s[::-1] for s in _SUFFIXES if len(s) >= 2)
+_INFIX_TRIE = _compile(i for i in _INFIXES if len(i) >= 3)
+
+def _longest(trie: dict, chars) -> str | None:
+    """The longest morpheme in ``trie`` that ``chars`` starts with, or None."""
+    node, found = trie, None
+    for char in chars:
+        node = node.get(char)
+        if node is None:
+            break
+        found = node.get(None, found)
+    return found
+
+def guide_patterns(min_sentiment: float = None, max_sentiment: float = None) -> tuple[str, str] | None:
+    """
+    Builds regexes that steer generation toward words scoring within
+    ``[min_sentiment, max_sentiment]``, for pattern.constrain().
+
+    The first regex requires a morpheme whose own score is in range (a
+    prefix at the start, a suffix at the end or an infix anywhere); the
+    second rejects every other morpheme in those places, since it would
+    pull the score out of range. Infixes inside a wanted one are allowed
+    ("mor" in "amor"). This mirrors the scoring closely but not exactly,
+    so generated words are still validated.
 
-_SORTED_PREFIXES = sorted(_PREFIXES.keys(), key=len, reverse=True)
-_SORTED_SUFFIXES = sorted(_SUFFIXES.keys(), key=len, reverse=True)
+    Returns:
+        (matches_regex, reject_regex), or None if neutral words are already
+        in range or no morpheme scores within it.
+    """
+    def in_range(score: float) -> bool:
+        score = _normalize_score(score)
+        return (min_sentiment is None or score >= min_sentiment) and (max_sentiment is None or score <= max_sentiment)
+
+    if in_range(0.0):
+        return None
+    prefixes = [p for p in _PREFIXES if len(p) >= 2]
+    suffixes = [s for s in _SUFFIXES if len(s) >= 2]
+    infixes = [i for i in _INFIXES if len(i) >= 3]
+    wanted_prefixes = [p for p in prefixes if in_range(_PREFIXES[p]) and p not in _INVERTING_PREFIXES]
+    wanted_suffixes = [s for s in suffixes if in_range(_SUFFIXES[s]) and s not in _INVERTING_SUFFIXES]
+    wanted_infixes = [i for i in infixes if in_range(_INFIXES[i])]
+    wanted = wanted_prefixes + wanted_suffixes + wanted_infixes
+    if not wanted:
+        return None
+    unwanted_prefixes = [p for p in prefixes if p not in wanted_prefixes]
+    unwanted_suffixes = [s for s in suffixes if s not in wanted_suffixes]
+    unwanted_infixes = [i for i in infixes if i not in wanted_infixes and not any(i in w for w in wanted)]
+
+    def alternation(prefixes, suffixes, infixes) -> str:
+        branches = []
+        if prefixes:
+            branches.append("^(?:" + "|".join(sorted(prefixes)) + ")")
+        if suffixes:
+            branches.append("(?:" + "|".join(sorted(suffixes)) + ")$")
+        return "|".join(branches + sorted(infixes))
+
+    return (alternation(wanted_prefixes, wanted_suffixes, wanted_infixes),
+            alternation(unwanted_prefixes, unwanted_suffixes, unwanted_infixes))
 
 def _normalize_score(score: float) -> float:
     """Normalizes a VADER score to a 0.0-1.0 scale."""
     return (score + 4) / 8
 
-def analyze_word_sentiment(word: str) -> float:
+def _split(word_lower: str) -> tuple[float, bool, str] | None:
     """
-    Analyzes word sentiment using a recursive, positional, multi-pass algorithm.
+    Finds the longest prefix of a word or, failing that, its longest suffix,
+    returning the affix's score, whether it inverts the stem's sentiment,
+    and the stem left over; None if the word has neither.
     """
-    word_lower = word.lower()
-    
-    if not word_lower:
-        return 0.5
+    p = _longest(_PREFIX_TRIE, word_lower)
+    if p is not None:
+        return _PREFIXES[p], p in _INVERTING_PREFIXES, word_lower[len(p):]
+    s = _longest(_SUFFIX_TRIE, reversed(word_lower))
+    if s is not None:
+        s = s[::-1]
+        return _SUFFIXES[s], s in _INVERTING_SUFFIXES, word_lower[:-len(s)]
+    return None
+
+def _with_stem(affix_score: float, inverting: bool, stem_sentiment: float) -> float:
+    """Combines an affix with the sentiment of its (long enough) stem."""
+    # If the stem is neutral, the affix's sentiment dominates.
+    if stem_sentiment == 0.5:
+        return _normalize_score(affix_score)
+
+    if inverting:
+        return 1.0 - stem_sentiment
 
-    if word_lower in _WORD_LEXICON:
-        return _normalize_score(_WORD_LEXICON[word_lower])
-
-    for p in _SORTED_PREFIXES:
-        if len(p) >= 2 and word_lower.startswith(p):
-            prefix_score = _PREFIXES[p]
-            stem = word_lower[len(p):]
-            
-            if len(stem) < 4:
-                return _normalize_score(prefix_score)
-
-            stem_sentiment = analyze_word_sentiment(stem)
-            
-            # If the stem is neutral, the prefix's sentiment dominates.
-            if stem_sentiment == 0.5:
-                return _normalize_score(prefix_score)
-            
-            if p in _INVERTING_PREFIXES:
-                return 1.0 - stem_sentiment
-            
-            avg_raw_score = (prefix_score + (stem_sentiment * 8 - 4)) / 2
-            return _normalize_score(avg_raw_score)
-
-    for s in _SORTED_SUFFIXES:
-        if len(s) >= 2 and word_lower.endswith(s):
-            suffix_score = _SUFFIXES[s]
-            stem = word_lower[:-len(s)]
-
-            if len(stem) < 4:
-                return _normalize_score(suffix_score)
-            
-            stem_sentiment = analyze_word_sentiment(stem)
-
-            if stem_sentiment == 0.5:
-                return _normalize_score(suffix_score)
-            
-            if s in _INVERTING_SUFFIXES:
-                return 1.0 - stem_sentiment
-
-            avg_raw_score = (suffix_score + (stem_sentiment * 8 - 4)) / 2
-            return _normalize_score(avg_raw_score)
+    avg_raw_score = (affix_score + (stem_sentiment * 8 - 4)) / 2
+    return _normalize_score(avg_raw_score)
 
+def _infix_score(word_lower: str) -> float:
+    """Scores a word by the infixes in it, or 0.5 if there are none."""
+    # Greedy, left to right: the longest infix starting at each position
+    # counts, and scanning resumes after it.
     found_scores = []
     i = 0
-    while i < len(word_lower):
-        best_match = ""
-        for j in range(len(word_lower), i, -1):
-            substring = word_lower[i:j]
-            if len(substring) >= 3 and substring in _INFIXES:
-                best_match = substring
+    n = len(word_lower)
+    while i < n:
+        node, best_match = _INFIX_TRIE, None
+        for j in range(i, n):
+            node = node.get(word_lower[j])
+            if node is None:
                 break
-        
+            best_match = node.get(None, best_match)
+
         if best_match:
             found_scores.append(_INFIXES[best_match])
             i += len(best_match)
@@ -116,4 +191,119 @@ def analyze_word_sentiment(word: str) -> float:
         return 0.5
 
     avg_score = sum(found_scores) / len(found_scores)
-    return _normalize_score(avg_score)
\ No newline at end of file
+    return _normalize_score(avg_score)
+
+def analyze_word_sentiment(word: str) -> float:
+    """
+    Analyzes word sentiment using a recursive, positional, multi-pass algorithm.
+    """
+    return _analyze(word.lower())
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _analyze(word_lower: str) -> float:
+    if not word_lower:
+        return 0.5
+
+    lexicon = _word_lexicon()
+    if word_lower in lexicon:
+        return _normalize_score(lexicon[word_lower])
+
+    split = _split(word_lower)
+    if split is None:
+        return _infix_score(word_lower)
+
+    affix_score, inverting, stem = split
+    if len(stem) < 4:
+        return _normalize_score(affix_score)
+    return _with_stem(affix_score, inverting, _analyze(stem))
+
+def _pattern(node: dict) -> str:
+    """
+    A regex matching the morphemes of a trie, longest first: each node
+    tries its children before ending, so backtracking yields the longest
+    morpheme that matches.
+    """
+    branches = [re.escape(char) + _pattern(child) for char, child in node.items() if char is not None]
+    if None in node:
+        branches.append("")
+    if len(branches) == 1:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")"
+
+# Scanning with the infix trie as a regex takes the longest infix at each
+# position and resumes after it, exactly as _infix_score() does, but over a
+# whole batch of words in one pass.
+_INFIX_RE = re.compile(_pattern(_INFIX_TRIE))
+
+def _infix_scores(words: list[str]) -> np.ndarray:
+    """_infix_score() of every word (none containing a newline), at once."""
+    # NumPy is only needed to score words in bulk.
+    import numpy as np
+
+    text = "\n".join(words)
+    starts = np.cumsum([0] + [len(word) + 1 for word in words[:-1]])
+    matches = [(m.start(), _INFIXES[m.group()]) for m in _INFIX_RE.finditer(text)]
+    positions = np.array([start for start, _ in matches], dtype=np.int64)
+    owners = np.searchsorted(starts, positions, side="right") - 1
+    weights = np.array([score for _, score in matches], dtype=np.float64)
+    totals = np.bincount(owners, weights=weights, minlength=len(words))
+    counts = np.bincount(owners, minlength=len(words))
+    return np.where(counts > 0, (totals / np.maximum(counts, 1) + 4) / 8, 0.5)
+
+def _score_batch(words: list[str]) -> list[float]:
+    """
+    Scores distinct lowercased words as analyze_word_sentiment() would.
+    Affixes are matched once per word and the words grouped by the stem
+    they leave, so that every distinct stem in the batch is scored once,
+    as one smaller batch; words without affixes share one infix scan.
+    """
+    lexicon = _word_lexicon()
+    scores = {}
+    by_stem = {}
+    plain = []
+    for word in words:
+        if not word:
+            scores[word] = 0.5
+        elif word in lexicon:
+            scores[word] = _normalize_score(lexicon[word])
+        elif (split := _split(word)) is None:
+            if "\n" in word:
+                scores[word] = _infix_score(word)
+            else:
+                plain.append(word)
+        elif len(split[2]) < 4:
+            scores[word] = _normalize_score(split[0])
+        else:
+            by_stem.setdefault(split[2], []).append((word, split[0], split[1]))
+
+    if plain:
+        scores.update(zip(plain, _infix_scores(plain).tolist()))
+    stems = list(by_stem)
+    for stem, stem_sentiment in zip(stems, _score_batch(stems) if stems else ()):
+        for word, affix_score, inverting in by_stem[stem]:
+            scores[word] = _with_stem(affix_score, inverting, stem_sentiment)
+    return [scores[word] for word in words]
+
+# Distinct words per worker task in score_many(); fewer are scored in-process.
+SCORE_CHUNK_SIZE = 16384
+
+def score_many(words: Iterable[str], jobs: int = 1) -> np.ndarray:
+    """
+    Scores many words at once, returning an array of what
+    analyze_word_sentiment() gives for each. Repeated words and stems are
+    scored once, and with ``jobs`` > 1 large batches are split over that
+    many worker processes.
+    """
+    import numpy as np
+
+    lowered = [word.lower() for word in words]
+    distinct = list(dict.fromkeys(lowered))
+    if jobs > 1 and len(distinct) > SCORE_CHUNK_SIZE:
+        chunks = [distinct[i:i + SCORE_CHUNK_SIZE] for i in range(0, len(distinct), SCORE_CHUNK_SIZE)]
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(jobs) as pool:
+            scores = [score for chunk in pool.map(_score_batch, chunks) for score in chunk]
+    else:
+        scores = _score_batch(distinct)
+    table = dict(zip(distinct, scores))
+    return np.fromiter((table[word] for word in lowered), dtype=np.float64, count=len(lowered))
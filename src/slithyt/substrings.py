@@ -0,0 +1,85 @@
+"""slithyt.substrings — reject words that contain a blocked string.
+
+An exact blocklist lets ``"xassholex"`` through, and a ``--reject-regex``
+alternation of hundreds of strings is slow. A ``SubstringMatcher`` compiles
+a blocklist into an Aho-Corasick automaton instead: a trie of the blocked
+strings whose failure links are folded into a full transition table, so
+scanning a word is one dictionary lookup per character however many
+strings are blocked.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterable
+
+# Blocked strings shorter than this are ignored when matching substrings,
+# since entries like "a" would block nearly every word; they are still
+# matched exactly by the blocklist itself.
+DEFAULT_MIN_LEN = 3
+
+
+class SubstringMatcher:
+    """An Aho-Corasick automaton over a set of blocked strings.
+
+    ``transitions[s]`` maps a character to the next state, with failure
+    links already applied (missing characters go back to the root, state 0),
+    and ``matches[s]`` is a blocked string that ends at state ``s`` (the
+    one it spells, if any), or None.
+    """
+
+    def __init__(self, transitions: list[dict[str, int]], matches: list[str | None]):
+        self.transitions = transitions
+        self.matches = matches
+
+    @classmethod
+    def build(cls, words: Iterable[str], min_len: int = DEFAULT_MIN_LEN) -> "SubstringMatcher":
+        """Compiles the blocked strings of at least ``min_len`` characters (lowercased)."""
+        goto: list[dict[str, int]] = [{}]
+        matches: list[str | None] = [None]
+        for word in sorted({w.strip().lower() for w in words}):
+            if len(word) < max(min_len, 1):
+                continue
+            state = 0
+            for char in word:
+                if char not in goto[state]:
+                    goto.append({})
+                    matches.append(None)
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            matches[state] = word
+
+        # Breadth-first, each state inherits its failure state's transitions
+        # (already complete, being shallower) beneath its own, and its match
+        # if it has none.
+        transitions = [dict(goto[0])]
+        transitions.extend({} for _ in range(len(goto) - 1))
+        failure = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            fallback = failure[state]
+            transitions[state] = {**transitions[fallback], **goto[state]}
+            matches[state] = matches[state] or matches[fallback]
+            for char, child in goto[state].items():
+                failure[child] = transitions[fallback].get(char, 0)
+                queue.append(child)
+        return cls(transitions, matches)
+
+    def __len__(self) -> int:
+        """The number of states."""
+        return len(self.transitions)
+
+    def find(self, word: str) -> str | None:
+        """Returns the first blocked string found in ``word`` (scanning left to right), or None."""
+        transitions, matches = self.transitions, self.matches
+        state = 0
+        for char in word.lower():
+            state = transitions[state].get(char, 0)
+            if matches[state] is not None:
+                return matches[state]
+        return None
+
+    def __contains__(self, word: str) -> bool:
+        """Whether ``word`` contains any blocked string."""
+        return self.find(word) is not None
@@ -1,4 +1,5 @@
 import re
+from dataclasses import dataclass
 from typing import Set
 from . import sentiment
 from . import pronounce
@@ -27,10 +28,17 @@ def validate_word(
     corpus_rejection_set: set[str] = None,
     min_sentiment: float = None,
     max_sentiment: float = None,
-    min_pronounceability: float = None
+    min_pronounceability: float = None,
+    blocked_substrings=None,
+    neighbor_index=None,
+    homophone_index=None,
 ) -> bool:
     """
-    Validates a word against a set of constraints.
+    Validates a word against a set of constraints. ``blocked_substrings``
+    (a substrings.SubstringMatcher) rejects words containing a blocked string,
+    and ``neighbor_index`` (a neighbors.EditIndex) words within its
+    ``max_distance`` edits of a known word. ``homophone_index`` (a
+    phonetic.SoundIndex) rejects words that sound like a known word.
     """
     if not word:
         return False
@@ -45,6 +53,12 @@ def validate_word(
         return False
     if corpus_rejection_set and word_lower in corpus_rejection_set:
         return False
+    if blocked_substrings is not None and word_lower in blocked_substrings:
+        return False
+    if neighbor_index is not None and word_lower in neighbor_index:
+        return False
+    if homophone_index is not None and word_lower in homophone_index:
+        return False
     if min_sentiment is not None or max_sentiment is not None:
         score = sentiment.analyze_word_sentiment(word)
         if min_sentiment is not None and score < min_sentiment:
@@ -55,4 +69,35 @@ def validate_word(
         score = pronounce.score_pronounceability(word)
         if score < min_pronounceability:
             return False
-    return True
\ No newline at end of file
+    return True
+
+@dataclass
+class Constraints:
+    """
+    The constraints a generated word must satisfy, bundled so they can be
+    handed to generation engines and worker processes as one object. The
+    length window bounds generation; the rest mirrors validate_word().
+    """
+    min_len: int = 5
+    max_len: int | None = 10
+    matches_regex: str = None
+    reject_regex: str = None
+    dictionary_set: set[str] = None
+    blocklist_set: set[str] = None
+    corpus_rejection_set: set[str] = None
+    min_sentiment: float = None
+    max_sentiment: float = None
+    min_pronounceability: float = None
+    blocked_substrings: object = None
+    neighbor_index: object = None
+    homophone_index: object = None
+
+    def validate(self, word: str) -> bool:
+        """Checks a word against the length window and validate_word()."""
+        if len(word) < self.min_len or (self.max_len is not None and len(word) > self.max_len):
+            return False
+        return validate_word(
+            word, self.matches_regex, self.reject_regex, self.dictionary_set, self.blocklist_set,
+            self.corpus_rejection_set, self.min_sentiment, self.max_sentiment, self.min_pronounceability,
+            self.blocked_substrings, self.neighbor_index, self.homophone_index,
+        )
@@ -0,0 +1,276 @@
+"""slithyt.wordindex — a compact, memory-mapped index of a word list.
+
+Loading a dictionary such as ``cmu.txt.gz`` into a Python set costs a
+decompression pass and ~10 MB of string objects on every run. A
+``WordIndex`` is the same words in one binary file, opened with ``mmap``
+in well under a millisecond and shared with worker processes through the
+page cache:
+
+* a header: ``MAGIC``, ``VERSION``, word count, slot count;
+* ``offsets``: ``count + 1`` little-endian uint32s into the string table;
+* ``slots``: an open-addressing hash table of uint32s (``index + 1``, or 0
+  for empty), probed linearly from ``crc32(word) % slots``;
+* the string table: every word, UTF-8 encoded, deduplicated and sorted.
+
+A membership test is one ``crc32`` and usually a single comparison, and
+iteration yields the words in sorted order. For word lists too large to
+stay in the page cache, ``FilteredIndex`` puts a ``bloom.BloomFilter`` in
+front of the index, so most misses never touch the index file.
+
+``write`` builds an index from a stream of words without ever holding them
+all: they are sorted in runs of ``SORT_RUN_SIZE`` (spilled to temporary
+files when there is more than one) and merged, and the string table goes
+straight to disk. Memory grows only by the offsets and slot table, a dozen
+or so bytes per word.
+"""
+
+from __future__ import annotations
+
+import heapq
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from . import bloom
+
+MAGIC = b"SLWI"
+VERSION = 1
+_HEADER = struct.Struct("<4sIII")
+
+# Words sorted in memory at once by ``write``; longer lists are sorted in
+# runs on disk and merged.
+SORT_RUN_SIZE = 1 << 20
+
+
+def _slot_count(count: int) -> int:
+    slots = 1
+    while slots < 2 * count:
+        slots *= 2
+    return slots
+
+
+def _slot_table(hashes, slots: int):
+    """The open-addressing table of words ``0..len(hashes)-1``, by linear
+    probing from ``hash % slots``. Every unplaced word tries its next slot
+    in each round, and of the words trying the same empty slot the first
+    takes it; slots never empty again, so each word stays reachable."""
+    # NumPy is only needed to build an index, not to read one.
+    import numpy as np
+
+    table = np.zeros(slots, dtype="<u4")
+    pending = np.arange(len(hashes), dtype=np.uint32)
+    position = np.asarray(hashes, dtype=np.uint32) & np.uint32(slots - 1)
+    while len(pending):
+        free = np.flatnonzero(table[position] == 0)
+        taken, first = np.unique(position[free], return_index=True)
+        table[taken] = pending[free[first]] + 1
+        placed = np.zeros(len(pending), dtype=bool)
+        placed[free[first]] = True
+        pending = pending[~placed]
+        position = (position[~placed] + 1) & np.uint32(slots - 1)
+    return table
+
+
+def pack(words: Iterable[str]) -> bytes:
+    """Return the index of ``words`` as bytes, e.g. to embed in another file."""
+    encoded = sorted({w.encode("utf-8") for w in words})
+    offsets = array("I", [0])
+    for word in encoded:
+        offsets.append(offsets[-1] + len(word))
+    slots = _slot_count(len(encoded))
+    table = _slot_table(array("I", map(zlib.crc32, encoded)), slots)
+    return b"".join((
+        _HEADER.pack(MAGIC, VERSION, len(encoded), slots),
+        _little_endian(offsets),
+        table.tobytes(),
+        *encoded,
+    ))
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("I", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write(
+    words: Iterable[str],
+    path: str | os.PathLike,
+    *,
+    filter_error_rate: float | None = None,
+) -> bloom.BloomFilter | None:
+    """Write the index of ``words`` to ``path``, atomically, in one streamed
+    pass (see the module docs); words must not contain newlines.
+
+    With ``filter_error_rate``, a ``bloom.BloomFilter`` of the same words
+    is filled during that pass and returned (sized for the number of words
+    given, duplicates included); otherwise returns None."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tempfile.TemporaryDirectory(prefix=f"{path.name}.", dir=path.parent) as spill:
+        runs, total = _sorted_runs(words, spill)
+        screen = None
+        if filter_error_rate is not None:
+            screen = bloom.BloomFilter(max(total, 1), filter_error_rate)
+        offsets, hashes = array("I", [0]), array("I")
+        data_path = os.path.join(spill, "data")
+        with open(data_path, "wb") as data:
+            previous = None
+            for word in heapq.merge(*runs):
+                if word == previous:
+                    continue
+                previous = word
+                data.write(word)
+                offsets.append(offsets[-1] + len(word))
+                hashes.append(zlib.crc32(word))
+                if screen is not None:
+                    screen.add(word.decode("utf-8"))
+        slots = _slot_count(len(hashes))
+        with open(tmp, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, len(hashes), slots))
+            f.write(_little_endian(offsets))
+            del offsets
+            f.write(_slot_table(hashes, slots).tobytes())
+            with open(data_path, "rb") as data:
+                shutil.copyfileobj(data, f)
+    os.replace(tmp, path)
+    return screen
+
+
+def _sorted_runs(words: Iterable[str], spill: str) -> tuple[list, int]:
+    """Sort ``words`` (UTF-8 encoded, deduplicated) in runs of at most
+    ``SORT_RUN_SIZE``, spilling all but a lone run to files under ``spill``.
+    Returns iterables of the runs, to merge, and the number of words."""
+    paths, run, total = [], set(), 0
+    for word in words:
+        if "\n" in word:
+            raise ValueError(f"word contains a newline: {word!r}")
+        run.add(word.encode("utf-8"))
+        total += 1
+        if len(run) >= SORT_RUN_SIZE:
+            paths.append(_spill(sorted(run), spill, len(paths)))
+            run = set()
+    if not paths:
+        return [sorted(run)], total
+    if run:
+        paths.append(_spill(sorted(run), spill, len(paths)))
+    return [_read_run(p) for p in paths], total
+
+
+def _spill(run: list[bytes], spill: str, number: int) -> str:
+    path = os.path.join(spill, f"run{number}")
+    with open(path, "wb") as f:
+        f.writelines(word + b"\n" for word in run)
+    return path
+
+
+def _read_run(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        for line in f:
+            yield line[:-1]
+
+
+class WordIndex:
+    """A read-only set of words backed by an index buffer (see the module docs).
+
+    Supports ``in``, ``len`` and sorted iteration, so it can stand in for
+    the sets that ``validator`` checks words against. Pickling an index
+    opened from a file carries only its path; it is re-mapped on load.
+    """
+
+    def __init__(self, buffer, path: str | None = None, offset: int = 0):
+        if len(buffer) < offset + _HEADER.size:
+            raise ValueError("not a slithyt word index")
+        magic, version, count, slots = _HEADER.unpack_from(buffer, offset)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a slithyt word index, or written by another version")
+        self.path = path
+        self.offset = offset
+        self._buffer = buffer
+        view = memoryview(buffer)
+        start = offset + _HEADER.size
+        self._offsets = view[start:start + 4 * (count + 1)].cast("I")
+        start += 4 * (count + 1)
+        self._slots = view[start:start + 4 * slots].cast("I")
+        self._data = start + 4 * slots
+        self._mask = slots - 1
+
+    @classmethod
+    def open(cls, path: str | os.PathLike, offset: int = 0) -> "WordIndex":
+        """Memory-map an index file written by ``write``, or an index
+        embedded at ``offset`` in another file."""
+        with open(path, "rb") as f:
+            if not os.fstat(f.fileno()).st_size:
+                raise ValueError("not a slithyt word index")
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer, str(path), offset)
+
+    @classmethod
+    def from_words(cls, words: Iterable[str]) -> "WordIndex":
+        """Build an index in memory, without a file."""
+        return cls(pack(words))
+
+    def _word(self, index: int) -> bytes:
+        return self._buffer[self._data + self._offsets[index]:self._data + self._offsets[index + 1]]
+
+    def __contains__(self, word) -> bool:
+        if not isinstance(word, str):
+            return False
+        encoded = word.encode("utf-8")
+        slot = zlib.crc32(encoded) & self._mask
+        while entry := self._slots[slot]:
+            if self._word(entry - 1) == encoded:
+                return True
+            slot = (slot + 1) & self._mask
+        return False
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(len(self)):
+            yield self._word(index).decode("utf-8")
+
+    def __getstate__(self):
+        if self.path is None:
+            return {"buffer": bytes(self._buffer[self.offset:])}
+        return {"path": self.path, "offset": self.offset}
+
+    def __setstate__(self, state):
+        if "path" in state:
+            with open(state["path"], "rb") as f:
+                buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.__init__(buffer, state["path"], state["offset"])
+        else:
+            self.__init__(state["buffer"])
+
+
+class FilteredIndex:
+    """A ``WordIndex`` screened by a Bloom filter of the same words.
+
+    Words the filter rules out are rejected from its small bit array alone;
+    only filter hits, true or (at the filter's error rate) false, are
+    confirmed against the exact index. Answers are always exact.
+    """
+
+    def __init__(self, screen, index: WordIndex):
+        self.screen = screen
+        self.index = index
+
+    def __contains__(self, word) -> bool:
+        return isinstance(word, str) and word in self.screen and word in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.index)
@@ -0,0 +1,43 @@
+# Tests for the bloom module.
+import pytest
+from slithyt import bloom
+
+def test_bloom_filter_membership_and_error_rate():
+    """Tests that added words are always found and false positives stay near the target rate."""
+    words = [f"word{i}" for i in range(5000)]
+    bf = bloom.BloomFilter(5000, error_rate=0.01)
+    for w in words:
+        bf.add(w)
+    assert len(bf) == 5000
+    assert all(w in bf for w in words)
+    false_positives = sum(f"other{i}" in bf for i in range(20000))
+    assert false_positives / 20000 < 0.02
+
+def test_bloom_filter_rejects_bad_sizes():
+    with pytest.raises(ValueError):
+        bloom.BloomFilter(0)
+    with pytest.raises(ValueError):
+        bloom.BloomFilter(10, error_rate=1.5)
+
+def test_bloom_filter_saves_and_loads_mapped(tmp_path):
+    """Tests that a saved filter loads back with the same answers and pickles by path."""
+    import pickle
+    bf = bloom.BloomFilter(1000, error_rate=0.01)
+    for i in range(1000):
+        bf.add(f"word{i}")
+    path = tmp_path / "words.bloom"
+    bf.save(path)
+    saved = path.read_bytes()
+    loaded = bloom.BloomFilter.load(path)
+    assert len(loaded) == 1000 and loaded.num_hashes == bf.num_hashes
+    probes = [f"word{i}" for i in range(1000)] + [f"other{i}" for i in range(1000)]
+    assert [p in loaded for p in probes] == [p in bf for p in probes]
+    assert pickle.loads(pickle.dumps(loaded)).path == str(path)
+
+    loaded.add("extra")
+    copied = pickle.loads(pickle.dumps(loaded))
+    assert "extra" in copied and copied.path is None
+    assert path.read_bytes() == saved  # additions stay in memory
+    (tmp_path / "junk.bloom").write_bytes(b"junk")
+    with pytest.raises(ValueError):
+        bloom.BloomFilter.load(tmp_path / "junk.bloom")
@@ -0,0 +1,242 @@
+"""Tests for slithyt.cache — every test uses a temporary cache root."""
+
+import os
+import time
+
+import pytest
+
+from slithyt import cache, generator, ngrams
+
+
+def write_corpus(tmp_path, content="slithy\nautonomer\npythonic\n"):
+    path = tmp_path / "corpus.txt"
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_load_or_train_reuses_cached_model(tmp_path, monkeypatch):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    model, corpus_set = cache.load_or_train(corpus, n=3, root=root)
+    assert isinstance(model, generator.CompactModel)
+    assert "pythonic" in corpus_set
+    assert len(list((root / "models").iterdir())) == 2  # the model and its trie
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not retrain")
+
+    monkeypatch.setattr(generator, "train_from_corpus", fail)
+    cached, cached_set = cache.load_or_train(corpus, n=3, root=root)
+    assert cached_set == corpus_set
+    assert set(cached) == set(model)
+    assert cached.counts("^^") == model.counts("^^")
+
+
+def test_cache_key_tracks_content_and_order(tmp_path):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    cache.load_or_train(corpus, n=3, root=root)
+    cache.load_or_train(corpus, n=4, root=root)
+    write_corpus(tmp_path, "brillig\ntoves\n")
+    _, corpus_set = cache.load_or_train(corpus, n=3, root=root)
+    assert corpus_set == {"brillig", "toves"}
+    assert len(list((root / "models").iterdir())) == 5
+
+
+def test_new_orders_come_from_the_cached_trie(tmp_path, monkeypatch):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    cache.load_or_train(corpus, n=3, root=root)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not reread the corpus")
+
+    monkeypatch.setattr(ngrams.NgramTrie, "from_corpus", fail)
+    monkeypatch.setattr(generator, "train_from_corpus", fail)
+    model, corpus_set = cache.load_or_train(corpus, n=5, root=root, backoff=True)
+    assert "pythonic" in corpus_set
+    assert model.advance("zzzz", "o") == "o"
+    assert cache.load_trie(corpus, root=root).max_order == ngrams.DEFAULT_MAX_ORDER
+
+
+def test_large_alphabets_index_fewer_orders(tmp_path, capsys, monkeypatch):
+    # 2000 distinct characters fit order-5 codes in 64 bits, but not order 6.
+    chars = [chr(0x4E00 + i) for i in range(2000)]
+    corpus = write_corpus(tmp_path, "\n".join("".join(chars[i:i + 4]) for i in range(0, 2000, 4)) + "\n")
+    root = tmp_path / "cache"
+    model, corpus_set = cache.load_or_train(corpus, n=3, root=root)
+    assert model and len(corpus_set) == 500
+    assert cache.load_trie(corpus, root=root).max_order == 5
+
+    # Order 6 is beyond the trie: exact models train directly, backoff models fail cleanly.
+    model, corpus_set = cache.load_or_train(corpus, n=6, root=root)
+    assert model and len(corpus_set) == 500
+    assert cache.load_or_train(corpus, n=6, root=root, backoff=True) == ({}, set())
+    assert "ERROR" in capsys.readouterr().out
+    with pytest.raises(ngrams.AlphabetTooLarge) as e:
+        ngrams.NgramTrie.from_corpus(corpus, 6)
+    assert e.value.max_order == 5
+
+    # The edited trie is found under the order it was asked for, not the one it holds.
+    cache.apply_delta(corpus, ["".join(chars[:3])], [], root=root)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not recount the corpus")
+
+    monkeypatch.setattr(ngrams.NgramTrie, "from_corpus", fail)
+    assert len(cache.load_trie(corpus, root=root).word_counts) == 501
+
+
+def test_no_cache_and_corrupt_entries(tmp_path):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    cache.load_or_train(corpus, n=3, root=root, use_cache=False)
+    assert not (root / "models").exists()
+
+    path = cache.model_path(cache.corpus_digest(corpus), 3, root)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(b"not a pickle")
+    model, _ = cache.load_or_train(corpus, n=3, root=root)
+    assert "^^" in model
+
+
+def test_prune(tmp_path):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    cache.load_or_train(corpus, n=2, root=root)
+    cache.load_or_train(corpus, n=3, root=root)
+    stale_version = root / "models" / f"{cache.MODEL_PREFIX}abc-n3-v0.pkl"
+    stale_version.write_bytes(b"")
+    old = cache.model_path(cache.corpus_digest(corpus), 2, root)
+    long_ago = time.time() - 90 * 24 * 60 * 60
+    os.utime(old, (long_ago, long_ago))
+
+    removed = cache.prune(root=root)
+    assert sorted(removed) == sorted([stale_version, old])
+    assert cache.prune(root=root) == []
+    assert len(cache.prune(root=root, everything=True)) == 2  # n=3 and the trie
+
+
+def test_apply_delta_updates_corpus_and_cached_trie(tmp_path, monkeypatch):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    added, removed = cache.read_delta(["+Brillig", "-pythonic", "# comment", "", "toves", "-jabberwock"])
+    assert (added, removed) == (["brillig", "toves"], ["pythonic", "jabberwock"])
+    _, removed_count = cache.apply_delta(corpus, added, removed, root=root)
+    assert removed_count == 1  # "jabberwock" was never in the corpus
+    with open(corpus, encoding="utf-8") as f:
+        assert f.read().split() == ["slithy", "autonomer", "brillig", "toves"]
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not reread the corpus")
+
+    monkeypatch.setattr(ngrams.NgramTrie, "from_corpus", fail)
+    model, corpus_set = cache.load_or_train(corpus, n=3, root=root)
+    assert corpus_set == {"slithy", "autonomer", "brillig", "toves"}
+    assert "^b" in model and "^p" not in model
+
+
+def test_reweighting_a_blend_reuses_cached_tries(tmp_path, monkeypatch):
+    first = write_corpus(tmp_path)
+    second = tmp_path / "second.txt"
+    second.write_text("brillig\ntoves\n", encoding="utf-8")
+    root = tmp_path / "cache"
+    model, corpus_set = cache.load_blend([(first, 0.7), (str(second), 0.3)], n=3, root=root)
+    assert corpus_set == {"slithy", "autonomer", "pythonic", "brillig", "toves"}
+    assert "^b" in model and "^p" in model
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not reread a corpus")
+
+    monkeypatch.setattr(ngrams.NgramTrie, "from_corpus", fail)
+    reweighted, _ = cache.load_blend([(first, 0.1), (str(second), 0.9)], n=3, root=root)
+    assert reweighted.counts("^^")["b"] > model.counts("^^")["b"]
+
+
+def test_word_index_is_built_once_and_mapped(tmp_path, monkeypatch):
+    words = tmp_path / "dictionary.txt"
+    words.write_text("Slithy\ntoves\n\n", encoding="utf-8")
+    root = tmp_path / "cache"
+    index = cache.load_word_index(str(words), root=root)
+    assert set(index) == {"slithy", "toves"}
+    assert index.path == str(cache.index_path(cache.corpus_digest(str(words)), root))
+
+    monkeypatch.setattr(cache.wordindex, "write", lambda *args: pytest.fail("should not rebuild"))
+    assert "toves" in cache.load_word_index(str(words), root=root)
+    assert cache.load_word_index(str(tmp_path / "missing.txt"), root=root) == set()
+    digest = cache.corpus_digest(str(words))
+    assert cache.prune(root=root, everything=True) == [cache.index_path(digest, root)]
+
+
+def test_word_index_with_a_filter_tier(tmp_path):
+    words = tmp_path / "blocklist.txt"
+    words.write_text("\n".join(f"bad{i}" for i in range(500)), encoding="utf-8")
+    root = tmp_path / "cache"
+    screened = cache.load_word_index(str(words), filter_error_rate=0.01, root=root)
+    assert "bad7" in screened and "good7" not in screened
+    digest = cache.corpus_digest(str(words))
+    assert cache.filter_path(digest, 0.01, root).exists()
+    again = cache.load_word_index(str(words), filter_error_rate=0.01, root=root)
+    assert again.screen.path == str(cache.filter_path(digest, 0.01, root))
+    assert len(cache.prune(root=root, everything=True)) == 2
+
+
+def test_substring_matcher_is_compiled_once(tmp_path, monkeypatch):
+    words = tmp_path / "blocklist.txt"
+    words.write_text("a\nbad\nWorse\n", encoding="utf-8")
+    root = tmp_path / "cache"
+    matcher = cache.load_substring_matcher(str(words), root=root)
+    assert "unbadly" in matcher and "WORSEN" in matcher and "apple" not in matcher
+
+    monkeypatch.setattr(cache.substrings.SubstringMatcher, "build", lambda *args: pytest.fail("should not rebuild"))
+    assert "unbadly" in cache.load_substring_matcher(str(words), root=root)
+    assert cache.load_substring_matcher(str(tmp_path / "missing.txt"), root=root) is None
+    assert len(cache.prune(root=root, everything=True)) == 1
+
+def test_edit_index_is_built_once_per_word_lists(tmp_path, monkeypatch):
+    dictionary = tmp_path / "dictionary.txt"
+    dictionary.write_text("billig\nApple\n", encoding="utf-8")
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text("frumious\n", encoding="utf-8")
+    root = tmp_path / "cache"
+    paths = [str(dictionary), str(blocklist), str(tmp_path / "missing.txt")]
+    index = cache.load_edit_index(paths, 1, root=root)
+    assert index.path is not None and len(index) == 3
+    assert "brillig" in index and "apples" in index and "frumous" in index and "jabber" not in index
+
+    monkeypatch.setattr(cache.neighbors, "write", lambda *args: pytest.fail("should not rebuild"))
+    assert "brillig" in cache.load_edit_index(list(reversed(paths)), 1, root=root)
+    assert len(cache.prune(root=root, everything=True)) == 1
+
+def test_sound_index_is_built_once_per_word_lists(tmp_path, monkeypatch):
+    dictionary = tmp_path / "dictionary.txt"
+    dictionary.write_text("night\n", encoding="utf-8")
+    blocklist = tmp_path / "blocklist.txt"
+    blocklist.write_text("Kleenex\n", encoding="utf-8")
+    root = tmp_path / "cache"
+    index = cache.load_sound_index([str(dictionary), str(blocklist)], root=root)
+    assert "nite" in index and "kleenecks" in index and "brillig" not in index
+
+    monkeypatch.setattr(cache.phonetic, "write", lambda *args: pytest.fail("should not rebuild"))
+    assert "nite" in cache.load_sound_index([str(blocklist), str(dictionary)], root=root)
+    assert len(cache.prune(root=root, everything=True)) == 1
+
+
+def test_word_trie_is_cached_per_word_lists_alphabet_and_window(tmp_path, monkeypatch):
+    corpus = write_corpus(tmp_path)
+    root = tmp_path / "cache"
+    alphabet = "$abcehilmnoprstuy"
+    trie = cache.load_word_trie([corpus], alphabet, 4, 8, root=root)
+    expected = generator.WordTrie.build(alphabet, ["slithy", "autonomer", "pythonic"], 4, 8)
+    assert trie.keys.tolist() == expected.keys.tolist()
+    assert trie.terminal.tolist() == expected.terminal.tolist()
+    # No word fits the window: the trie is empty rather than an error.
+    assert len(cache.load_word_trie([corpus], alphabet, 14, 16, root=root)) == 1
+
+    def fail(*args, **kwargs):
+        raise AssertionError("should not reread the word lists")
+
+    monkeypatch.setattr(cache, "_read_words", fail)
+    assert cache.load_word_trie([corpus], alphabet, 4, 8, root=root).keys.tolist() == expected.keys.tolist()
+    with pytest.raises(AssertionError):
+        cache.load_word_trie([corpus], alphabet, 4, 10, root=root)
@@ -1,6 +1,9 @@
 # Tests for the generator module.
 import tempfile
 import os
+import itertools
+import numpy as np
+import pytest
 from slithyt import generator
 
 def test_train_and_generate():
@@ -43,3 +46,245 @@ def test_train_and_generate():
     finally:
         # Clean up the temporary file
         os.remove(corpus_path)
+
+def test_compact_model_matches_list_model():
+    """
+    Tests that the compact model keeps the same successor counts as the
+    list-based model and generates words from the same character set.
+    """
+    corpus_content = "slithy\nautonomer\npythonic\nslither\n"
+
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+        tmp.write(corpus_content)
+        corpus_path = tmp.name
+
+    try:
+        model, corpus_set = generator.train_from_corpus(corpus_path, n=3)
+        compact, compact_set = generator.train_from_corpus(corpus_path, n=3, compact=True)
+        assert isinstance(compact, generator.CompactModel)
+        assert compact_set == corpus_set
+        assert set(compact) == set(model)
+        for prefix, chars in model.items():
+            expected = {c: chars.count(c) for c in set(chars)}
+            assert compact.counts(prefix) == expected
+
+        # Converting a list-based model gives the same table.
+        converted = generator.CompactModel.from_model(model, n=3)
+        assert converted.counts("sl") == compact.counts("sl") == {"i": 2}
+
+        word = generator.generate_word(compact, min_len=4, max_len=10, n=3)
+        assert len(word) >= 4
+        assert set(word).issubset(set("slithyautonomerpcn"))
+    finally:
+        os.remove(corpus_path)
+
+def test_compiled_model_and_batch_generation():
+    """
+    Tests that a compiled model encodes the same transitions as the compact
+    model and that batched generation is reproducible and stays in range.
+    """
+    corpus_content = "slithy\nautonomer\npythonic\nslither\n"
+
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+        tmp.write(corpus_content)
+        corpus_path = tmp.name
+
+    try:
+        compact, _ = generator.train_from_corpus(corpus_path, n=3, compact=True)
+        compiled = generator.compile_model(compact)
+        assert compiled.prefixes[compiled.start] == "^^"
+        assert compiled.alphabet[0] == "$"
+
+        # Each state's outgoing probabilities sum to one.
+        for s in range(len(compiled)):
+            row = compiled.probs[compiled.indptr[s]:compiled.indptr[s + 1]]
+            assert abs(row.sum() - 1.0) < 1e-9
+
+        words = generator.generate_batch(compiled, 500, min_len=4, max_len=10, rng=42)
+        assert words
+        assert words == generator.generate_batch(compiled, 500, min_len=4, max_len=10, rng=42)
+        for word in words:
+            assert 4 <= len(word) <= 10
+            assert set(word).issubset(set("slithyautonomerpcn"))
+
+        # A list-based model is compiled on the fly.
+        model, _ = generator.train_from_corpus(corpus_path, n=3)
+        assert generator.generate_batch(model, 50, min_len=4, max_len=10, n=3, rng=1)
+    finally:
+        os.remove(corpus_path)
+
+def test_batch_generation_follows_model_probabilities():
+    """Tests that batched sampling reproduces the trained transition frequencies."""
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+        tmp.write("ab\nab\nab\nac\n")
+        corpus_path = tmp.name
+
+    try:
+        model, _ = generator.train_from_corpus(corpus_path, n=2, compact=True)
+        words = generator.generate_batch(model, 20000, min_len=1, max_len=2, rng=7)
+        assert set(words) == {"ab", "ac"}
+        assert 0.72 < words.count("ab") / len(words) < 0.78
+    finally:
+        os.remove(corpus_path)
+
+def test_length_aware_batch_generation():
+    """
+    Tests that every length-aware walk lands in the requested window, even a
+    tight one, and that an impossible window yields nothing.
+    """
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+        tmp.write("ana\nanna\nhanna\nnan\n")
+        corpus_path = tmp.name
+
+    try:
+        model, _ = generator.train_from_corpus(corpus_path, n=2, compact=True)
+        compiled = generator.compile_model(model)
+
+        mass = generator.length_mass(compiled, 12)
+        assert mass.shape == (13, len(compiled))
+        assert mass[:, compiled.start].sum() <= 1.0 + 1e-9
+
+        words = generator.generate_batch(compiled, 300, min_len=9, max_len=10, rng=3)
+        assert len(words) == 300
+        assert all(9 <= len(word) <= 10 for word in words)
+
+        # Every corpus word is non-empty, so no walk can end at length 0.
+        assert generator.generate_batch(compiled, 10, min_len=0, max_len=0) == []
+    finally:
+        os.remove(corpus_path)
+
+def test_iter_words_streams_unique_valid_words():
+    """Tests that the streaming API yields unique words that pass the constraints."""
+    from itertools import islice
+    from slithyt import bloom, utils, validator
+
+    model, corpus_set = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    constraints = validator.Constraints(min_len=6, max_len=9, corpus_rejection_set=corpus_set, reject_regex="x")
+    words = list(islice(generator.iter_words(model, constraints, seed=2), 200))
+    assert len(set(words)) == 200
+    assert all(6 <= len(w) <= 9 and "x" not in w and w not in corpus_set for w in words)
+    assert list(islice(generator.iter_words(model, constraints, seed=2), 200)) == words
+
+    # A Bloom filter works as the dedup container and also skips pre-seen words.
+    seen = bloom.BloomFilter(1000, 0.001)
+    seen.add(words[0])
+    bloomed = list(islice(generator.iter_words(model, constraints, seed=2, seen=seen), 50))
+    assert bloomed[0] == words[1]
+    assert len(set(bloomed)) == 50
+
+    # The stream ends when the candidate budget runs out.
+    impossible = validator.Constraints(min_len=6, max_len=9, matches_regex="^zzz")
+    assert list(generator.iter_words(model, impossible, max_candidates=500)) == []
+
+def test_backoff_model_interpolates_all_orders():
+    """
+    Tests that the backoff model keeps a distribution for every prefix
+    length, backs off to shorter prefixes and stays creative at high n.
+    """
+    from slithyt import utils
+
+    corpus_path = utils.data_path("latin-female-names.txt")
+    model, corpus_set = generator.train_backoff(corpus_path, n=5)
+    exact, _ = generator.train_from_corpus(corpus_path, n=5, compact=True)
+    assert {len(prefix) for prefix in model} == {1, 2, 3, 4}
+    for prefix in model:
+        assert abs(sum(model.counts(prefix).values()) - 1.0) < 1e-9
+
+    # An unseen 4-character history falls back to its longest seen suffix.
+    assert model.advance("^^^a", "e") == exact.advance("^^^a", "e") == "^^ae"
+    assert exact.advance("zzzz", "a") is None
+    assert model.advance("zzzz", "a") == "a"
+    # From a backed-off (shorter) state, a walk climbs back to longer ones.
+    assert model.advance("^a", "e") == "^ae"
+    for prefix in (p for p in model if len(p) <= 2):
+        for char in model.successors(prefix)[0].replace("$", ""):
+            history = prefix + char
+            assert model.advance(prefix, char) == next(history[i:] for i in range(len(history)) if history[i:] in model)
+
+    compiled = generator.compile_model(model)
+    words = generator.generate_batch(compiled, 1000, min_len=5, max_len=10, rng=0)
+    exact_words = generator.generate_batch(generator.compile_model(exact), 1000, min_len=5, max_len=10, rng=0)
+    assert len(set(words) - corpus_set) > 5 * len(set(exact_words) - corpus_set)
+
+def test_log_likelihood_scores_batches_like_the_model():
+    """
+    Tests that vectorized scoring matches the model's own transition
+    probabilities, and scores impossible words as -inf.
+    """
+    import math
+    from slithyt import utils
+
+    model, _ = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    compiled = generator.compile_model(model)
+
+    def expected(word):
+        prefix, total = "^^", 0.0
+        for char in word + "$":
+            counts = model.counts(prefix) if prefix in model else {}
+            if char not in counts:
+                return -math.inf
+            total += math.log(counts[char] / sum(counts.values()))
+            prefix = model.advance(prefix, char) if char != "$" else prefix
+        return total
+
+    words = generator.generate_batch(compiled, 200, rng=0) + ["marcus", "mqrcus", "marcusé", ""]
+    scores = generator.log_likelihood(compiled, words, per_char=False)
+    assert scores.tolist() == [pytest.approx(expected(w)) for w in words]
+    per_char = generator.log_likelihood(compiled, ["marcus"])
+    assert per_char[0] == pytest.approx(expected("marcus") / 7)
+    rows = generator.char_log_probs(compiled, ["marcus", "ab"])
+    assert rows.shape == (2, 7)
+    assert rows[1, 1] == -math.inf and rows[1, 3:].tolist() == [0.0] * 4
+    assert generator.char_log_probs(compiled, []).shape == (0, 1)
+
+def test_enumerate_words_in_descending_probability():
+    """
+    Tests that enumeration yields every producible word exactly once, most
+    probable first, skipping rejected words and respecting length bounds.
+    """
+    from slithyt import utils, validator
+
+    model, corpus_set = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    compiled = generator.compile_model(model)
+    short = list(generator.enumerate_words(compiled, validator.Constraints(2, 4)))
+    words = [word for word, _ in short]
+    log_probs = [log_prob for _, log_prob in short]
+    assert len(set(words)) == len(words)
+    assert all(2 <= len(word) <= 4 for word in words)
+    assert all(a >= b - 1e-12 for a, b in zip(log_probs, log_probs[1:]))
+    assert log_probs == pytest.approx(generator.log_likelihood(compiled, words, per_char=False).tolist())
+    # Together they carry all the probability of words of 2 to 4 characters.
+    total = sum(np.exp(log_probs))
+    assert total == pytest.approx(generator.length_mass(compiled, 4)[2:, compiled.start].sum())
+
+    novel = validator.Constraints(5, 10, corpus_rejection_set=corpus_set)
+    first = [word for word, _ in itertools.islice(generator.enumerate_words(compiled, novel), 50)]
+    assert not set(first) & corpus_set
+    bounded = generator.enumerate_words(compiled, novel, max_frontier=100)
+    assert [word for word, _ in itertools.islice(bounded, 5)] == first[:5]
+
+def test_batch_generation_steers_off_known_words():
+    """
+    Tests that walks about to end on a known word continue to a novel one
+    instead, rather than producing the known word.
+    """
+    from slithyt import utils
+
+    model, corpus_set = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    compiled = generator.compile_model(model)
+    trie = generator.WordTrie.build(compiled.alphabet, corpus_set, 5, 10)
+    nodes = np.zeros(2, dtype=np.int64)
+    for a, b in zip("marcus", "marcxs"):
+        nodes = trie.step(nodes, np.array([compiled.alphabet.index(a), compiled.alphabet.index(b)]))
+    assert trie.completes(nodes).tolist() == [True, False]
+
+    plain = generator.generate_batch(compiled, 2000, 5, 10, rng=0)
+    steered = generator.generate_batch(compiled, 2000, 5, 10, rng=0, avoid=trie)
+    assert sum(word in corpus_set for word in plain) > 100
+    assert not any(word in corpus_set for word in steered)
+    assert len(steered) > 1900 and all(5 <= len(word) <= 10 for word in steered)
+
+    # No known word fits the window, so there is nothing to steer off.
+    empty = generator.WordTrie.build(compiled.alphabet, corpus_set, 14, 16)
+    assert len(empty) == 1
+    assert generator.generate_batch(compiled, 2000, 5, 10, rng=0, avoid=empty) == plain
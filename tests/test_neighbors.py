@@ -0,0 +1,48 @@
+# Tests for the neighbors module.
+import pickle
+import random
+
+import pytest
+from slithyt import neighbors, validator
+
+def _levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        prev, row[0] = row[0], i
+        for j, cb in enumerate(b, 1):
+            prev, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, prev + (ca != cb))
+    return row[-1]
+
+def test_distance_matches_dynamic_programming():
+    rng = random.Random(7)
+    for _ in range(2000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 9)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 9)))
+        assert neighbors.distance(a, b) == _levenshtein(a, b)
+    assert neighbors.within("kitten", "sitting", 3) and not neighbors.within("kitten", "sitting", 2)
+
+def test_edit_index_finds_every_word_within_its_distance():
+    rng = random.Random(3)
+    words = {"".join(rng.choice("abcde") for _ in range(rng.randint(1, 7))) for _ in range(300)}
+    index = neighbors.EditIndex.from_words(words, 2)
+    for _ in range(200):
+        probe = "".join(rng.choice("abcdef") for _ in range(rng.randint(1, 8)))
+        expected = sorted(w for w in words if _levenshtein(probe, w) <= 2)
+        assert index.neighbors(probe) == expected
+        assert (probe in index) == bool(expected)
+
+def test_edit_index_file_and_validation(tmp_path):
+    path = tmp_path / "words.idx"
+    neighbors.write(["billig", "slithy"], 1, path)
+    index = neighbors.EditIndex.open(path)
+    assert index.max_distance == 1 and sorted(index.words) == ["billig", "slithy"]
+    assert index.neighbors("Brillig") == ["billig"]
+    assert pickle.loads(pickle.dumps(index)).neighbors("slithey") == ["slithy"]
+    assert not validator.validate_word("brillig", neighbor_index=index)
+    assert validator.validate_word("borogove", neighbor_index=index)
+
+    with pytest.raises(ValueError):
+        neighbors.pack(["a"], -1)
+    (tmp_path / "junk.idx").write_bytes(b"junk")
+    with pytest.raises(ValueError):
+        neighbors.EditIndex.open(tmp_path / "junk.idx")
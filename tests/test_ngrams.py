@@ -0,0 +1,68 @@
+# Tests for the ngrams module.
+import pytest
+from slithyt import generator, ngrams, utils
+
+def test_trie_serves_every_order_like_direct_training():
+    """
+    Tests that models derived from one trie match those trained directly
+    on the corpus for each order, with and without backoff.
+    """
+    corpus_path = utils.data_path("latin-female-names.txt")
+    trie = ngrams.NgramTrie.from_corpus(corpus_path, max_order=5)
+    for n in range(1, 6):
+        exact, corpus_set = generator.train_from_corpus(corpus_path, n=n, compact=True)
+        model = trie.model(n)
+        assert trie.corpus_word_set == corpus_set
+        assert set(model) == set(exact)
+        for prefix in exact:
+            assert model.successors(prefix)[0] == exact.successors(prefix)[0]
+            assert list(model.successors(prefix)[1]) == list(exact.successors(prefix)[1])
+
+    smoothed = trie.model(4, backoff=True)
+    direct, _ = generator.train_backoff(corpus_path, n=4)
+    assert set(smoothed) == set(direct)
+    for prefix in direct:
+        expected = direct.counts(prefix)
+        assert smoothed.counts(prefix).keys() == expected.keys()
+        assert all(abs(p - expected[c]) < 1e-12 for c, p in smoothed.counts(prefix).items())
+
+def test_trie_counts_and_order_bounds():
+    """Tests the raw count table and that orders beyond the trie are refused."""
+    trie = ngrams.NgramTrie.from_words(["abab", "ab"], max_order=3)
+    prefixes, indptr, successors, counts = trie.counts(3)
+    row = prefixes.index("ab")
+    symbols = [trie.alphabet[s] for s in successors[indptr[row]:indptr[row + 1]]]
+    assert dict(zip(symbols, counts[indptr[row]:indptr[row + 1]])) == {"$": 2, "a": 1}
+    for n in (0, 4):
+        with pytest.raises(ValueError):
+            trie.model(n)
+
+def test_adding_and_removing_words_matches_retraining():
+    """Tests that incremental updates leave the same model a full retrain would."""
+    trie = ngrams.NgramTrie.from_words(["slithy", "toves", "toves", "gyre"], max_order=4)
+    assert trie.add_words(["wabe", "jabberwock"]) == 2
+    assert trie.remove_words(["toves", "unknown"]) == 1
+    fresh = ngrams.NgramTrie.from_words(["slithy", "gyre", "wabe", "jabberwock"], max_order=4)
+    assert trie.corpus_word_set == fresh.corpus_word_set
+    for n in (2, 4):
+        for updated, expected in ((trie.model(n), fresh.model(n)), (trie.model(n, True), fresh.model(n, True))):
+            assert set(updated) == set(expected)
+            for prefix in expected:
+                assert updated.counts(prefix) == pytest.approx(expected.counts(prefix))
+
+def test_blend_scales_each_corpus_to_its_weight():
+    """Tests that a blend splits probability mass between corpora by weight."""
+    greek = ngrams.NgramTrie.from_words(["aa", "ab"], max_order=3)
+    stars = ngrams.NgramTrie.from_words(["bb", "bbbbbb"], max_order=4)
+    blended = ngrams.NgramTrie.blend([(greek, 3), (stars, 1)])
+    assert blended.max_order == 3
+    assert blended.corpus_word_set == {"aa", "ab", "bb", "bbbbbb"}
+    # Word starts are 2 of greek's 6 observations and 2 of stars' 10, each
+    # scaled by its corpus's weight.
+    starts = blended.model(2).counts("^")
+    assert starts["a"] / starts["b"] == pytest.approx((0.75 * 2 / 6) / (0.25 * 2 / 10))
+
+    alone = ngrams.NgramTrie.blend([(greek, 0.4)]).model(3)
+    assert {p: alone.counts(p) for p in alone} == {p: greek.model(3).counts(p) for p in greek.model(3)}
+    with pytest.raises(ValueError):
+        ngrams.NgramTrie.blend([(greek, 1), (stars, 0)])
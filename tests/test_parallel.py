@@ -0,0 +1,58 @@
+# Tests for the parallel module.
+from slithyt import generator, parallel, utils, validator
+
+def _corpus_job(min_len=4, max_len=10):
+    model, corpus_set = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    return parallel.CorpusJob(generator.compile_model(model), min_len, max_len), corpus_set
+
+def test_seeded_output_is_independent_of_jobs():
+    """Tests that a seed reproduces the same words for any number of workers."""
+    job, corpus_set = _corpus_job()
+    constraints = validator.Constraints(corpus_rejection_set=corpus_set)
+    serial = list(parallel.generate(job, constraints, 300, jobs=1, seed=11, max_candidates=10000))
+    assert len(serial) == 300
+    assert len(set(serial)) == 300
+    assert not set(serial) & corpus_set
+    assert list(parallel.generate(job, constraints, 300, jobs=3, seed=11, max_candidates=10000)) == serial
+    assert list(parallel.generate(job, constraints, 300, jobs=1, seed=12, max_candidates=10000)) != serial
+
+def test_candidate_budget_and_constraints():
+    """Tests that generation gives up after its budget and honors validation."""
+    job, _ = _corpus_job()
+    words = list(parallel.generate(job, validator.Constraints(matches_regex="^zz"), 5, seed=1, max_candidates=600))
+    assert words == []
+    words = list(parallel.generate(job, validator.Constraints(min_pronounceability=0.9), 5, seed=1, max_candidates=1000))
+    assert len(words) == 5
+
+def test_patience_ends_an_exhausted_stream():
+    """Tests that an unbounded stream stops once no chunk finds a new word."""
+    phonetic_model = {("^", "^"): ["K", "M"], ("^", "K"): ["AE1"], ("^", "M"): ["AE1"], ("K", "AE1"): ["$"], ("M", "AE1"): ["$"]}
+    transcription_model = {"K": ["k", "c"], "M": ["m"], "AE": ["a"], "T": ["t"]}
+    job = parallel.RhymeJob(phonetic_model, transcription_model, ["AE1", "T"])
+    constraints = validator.Constraints(min_len=0, max_len=None)
+    chunks = list(parallel.generate_chunks(job, constraints, None, seed=4, patience=5))
+    assert sorted(w for words in chunks for w in words) == ["caat", "kaat", "maat"]
+    assert chunks[-5:] == [[]] * 5
+    assert sorted(parallel.generate(job, constraints, None, seed=4, patience=5)) == ["caat", "kaat", "maat"]
+
+def test_rhyme_job_is_reproducible():
+    """Tests that the rhyme job draws from its seeded stream, not the global RNG."""
+    phonetic_model = {("^", "^"): ["K", "M"], ("^", "K"): ["AE1"], ("^", "M"): ["AE1"], ("K", "AE1"): ["$"], ("M", "AE1"): ["$"]}
+    transcription_model = {"K": ["k", "c"], "M": ["m"], "AE": ["a"], "T": ["t"]}
+    job = parallel.RhymeJob(phonetic_model, transcription_model, ["AE1", "T"])
+    constraints = validator.Constraints(min_len=0, max_len=None)
+    first = list(parallel.generate(job, constraints, 3, seed=4))
+    assert sorted(first) == ["caat", "kaat", "maat"]
+    assert list(parallel.generate(job, constraints, 3, seed=4, jobs=2)) == first
+
+def test_score_keeps_input_order_for_any_jobs(monkeypatch):
+    """Tests that batch scoring yields one record per word, in order, pooled or not."""
+    monkeypatch.setattr(parallel, "SCORE_CHUNK_SIZE", 4)
+    words = [f"word{i}" for i in range(10)] + ["happy", "word3", "xq"]
+    constraints = validator.Constraints(min_len=0, max_len=None, dictionary_set={"word3"}, reject_regex="q")
+    serial = list(parallel.score(iter(words), constraints, jobs=1))
+    assert [r["word"] for r in serial] == words
+    assert [r["word"] for r in serial if not r["valid"]] == ["word3", "word3", "xq"]
+    assert serial[10]["sentiment"] > 0.5 and 0 <= serial[0]["pronounceability"] <= 1
+    assert list(parallel.score(words, constraints, jobs=2)) == serial
+    assert list(parallel.score([], constraints, jobs=2)) == []
@@ -0,0 +1,69 @@
+# Tests for the pattern module.
+import os
+import random
+import re
+import tempfile
+from slithyt import generator, pattern
+
+ALPHABET = "$abcikx"
+
+def _dfa_matches(dfa, word):
+    state = dfa.start
+    for c in word:
+        state = dfa.transitions[state, ALPHABET.index(c)]
+    return dfa.transitions[state, 0] == dfa.accept
+
+def test_dfa_agrees_with_re_search():
+    """Tests that compiled DFAs accept exactly what re.search() matches."""
+    rng = random.Random(5)
+    words = ["".join(rng.choice(ALPHABET[1:]) for _ in range(rng.randint(0, 7))) for _ in range(2000)]
+    patterns = [
+        "^ka.*ix$", "ka", "a|b$", "^(ab|c)+x?$", "[^a]k", "a{2,3}", "^.{3}$",
+        "x$|^i", "(?:ab)*c", "", "a*?", "[A-C]x", r"\w\w$", "k.?i", "[ak-x]{2,}$",
+        r"\N{LATIN SMALL LETTER K}a", r"[\N{LATIN SMALL LETTER A}x]$",
+    ]
+    for p in patterns:
+        dfa = pattern.compile_dfa(p, ALPHABET)
+        for word in words:
+            assert _dfa_matches(dfa, word) == bool(re.search(p, word, re.IGNORECASE)), (p, word)
+
+def test_unsupported_patterns():
+    """Tests that syntax outside the subset is reported, not mis-compiled."""
+    for p in ["(?=a)", r"(a)\1", r"a\b", "(?i)a", "a*+"]:
+        try:
+            pattern.compile_dfa(p, ALPHABET)
+            assert False, p
+        except pattern.UnsupportedPattern:
+            pass
+    # An atom the parser cannot isolate is unsupported, not an invalid regex.
+    try:
+        pattern._Parser("", ALPHABET)._matching("\\N")
+        assert False
+    except pattern.UnsupportedPattern:
+        pass
+
+def test_constrained_generation():
+    """
+    Tests that generation from a constrained model only yields words that
+    satisfy both patterns, and that unsupported patterns fall back.
+    """
+    with tempfile.NamedTemporaryFile(mode='w', delete=False, encoding='utf-8') as tmp:
+        tmp.write("kalix\nkarina\nmarix\nfelix\nkatrina\nbeatrix\nkalina\n")
+        corpus_path = tmp.name
+
+    try:
+        model, _ = generator.train_from_corpus(corpus_path, n=3, compact=True)
+        compiled = generator.compile_model(model)
+        constrained = pattern.constrain(compiled, "^ka.*ix$", "t")
+        words = generator.generate_batch(constrained, 200, min_len=4, max_len=12, rng=0)
+        assert len(words) == 200
+        for word in words:
+            assert re.search("^ka.*ix$", word) and "t" not in word
+
+        # A word cannot both match and be rejected by the same pattern.
+        impossible = pattern.constrain(compiled, "^ka", "^ka")
+        assert generator.generate_batch(impossible, 10, min_len=1, max_len=12) == []
+
+        assert pattern.constrain(compiled, r"(?=k)ka") is None
+    finally:
+        os.remove(corpus_path)
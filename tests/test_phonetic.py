@@ -0,0 +1,24 @@
+# Tests for the phonetic module.
+import pickle
+
+from slithyt import phonetic, validator
+
+def test_sound_key_equates_spellings_pronounced_alike():
+    for a, b in [("Kleenex", "Kleenecks"), ("light", "lite"), ("knight", "nite"), ("phone", "fone"),
+                 ("Xerox", "zerocks"), ("cent", "sent"), ("nice", "nyce"), ("candy", "kandee"),
+                 ("humble", "humbel"), ("city", "sitty")]:
+        assert phonetic.sound_key(a) == phonetic.sound_key(b), (a, b)
+    for a, b in [("lit", "light"), ("cat", "cut"), ("slithy", "sloth"), ("fly", "flea")]:
+        assert phonetic.sound_key(a) != phonetic.sound_key(b), (a, b)
+    assert phonetic.sound_key("don't!") == phonetic.sound_key("dont")
+
+def test_sound_index_file_and_validation(tmp_path):
+    path = tmp_path / "sounds.idx"
+    phonetic.write(["Kleenex", "night", "kleenex", ""], path)
+    index = phonetic.SoundIndex.open(path)
+    assert len(index) == 2
+    assert "kleenecks" in index and "NITE" in index and "brillig" not in index and None not in index
+    assert "knight" in pickle.loads(pickle.dumps(index))
+    assert not validator.validate_word("kleenecks", homophone_index=index)
+    assert validator.validate_word("brillig", homophone_index=index)
+    assert "lite" in phonetic.SoundIndex.from_words(["light"])
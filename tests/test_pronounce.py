@@ -30,4 +30,31 @@ def test_pronounceability_scorer():
     # 5. Edge cases should not cause errors
     assert pronounce.score_pronounceability("") == 0.0
     assert pronounce.score_pronounceability("a") < 0.8 # Bad ratio
-    assert pronounce.score_pronounceability("b") == 0.7 # Bad ratio
\ No newline at end of file
+    assert pronounce.score_pronounceability("b") == 0.7 # Bad ratio
+
+# Scores of the previous, three-pass implementation, which the one-pass
+# scorer and score_many() must reproduce exactly (not just approximately).
+_PREVIOUS_SCORES = {
+    "veridian": 1.0,
+    "rhythmsk": 0.0,
+    "schtroumpf": 0.10000000000000009,
+    "eunoia": 0.30000000000000004,
+    "Strength": 0.4,
+    "b": 0.7,
+    "x-ray": 0.7,
+    "Ångström": 0.0,
+    "Ab1e": 1.0,
+    "": 0.0,
+}
+
+def test_scores_are_unchanged():
+    for word, score in _PREVIOUS_SCORES.items():
+        assert pronounce.score_pronounceability(word) == score, word
+
+def test_score_many_matches_single_word_scores():
+    words = list(_PREVIOUS_SCORES) + ["kalani", "aeioua", "queueing", "a", "", "strengths"]
+    scores = pronounce.score_many(words)
+    assert scores.shape == (len(words),)
+    assert scores.tolist() == [pronounce.score_pronounceability(w) for w in words]
+    assert pronounce.score_many([]).shape == (0,)
+    assert pronounce.score_many(["", ""]).tolist() == [0.0, 0.0]
@@ -48,4 +48,78 @@ def test_whole_word_lookup():
     Tests that the validator finds whole words in the VADER lexicon first.
     """
     assert sentiment.analyze_word_sentiment("disaster") < 0.2
-    assert sentiment.analyze_word_sentiment("love") > 0.8
\ No newline at end of file
+    assert sentiment.analyze_word_sentiment("love") > 0.8
+
+def test_longest_match_scores_are_unchanged():
+    """
+    Tests exact scores, recorded from the linear-scan implementation the
+    affix and infix tries replaced (see scripts/bench_sentiment.py).
+    """
+    expected = {
+        "unhappiness": 0.2, "malvoluminous": 0.4375, "prosperterrible": 0.59375,
+        "disunhappy": 0.725, "fearlessless": 0.26249999999999996, "ambergris": 0.5,
+        "necrotoxic": 0.0625, "benecrimful": 0.640625, "zyxless": 0.25,
+        "honorificable": 0.65, "Amicable": 0.75,
+    }
+    for word, score in expected.items():
+        assert sentiment.analyze_word_sentiment(word) == score, word
+
+def test_stem_scores_are_memoized():
+    sentiment._analyze.cache_clear()
+    sentiment.analyze_word_sentiment("unhappiness")
+    sentiment.analyze_word_sentiment("UNHAPPINESS")
+    info = sentiment._analyze.cache_info()
+    assert info.hits >= 1 and info.maxsize == sentiment.MEMO_SIZE
+
+def test_lexicon_is_shipped_and_loaded_lazily():
+    """
+    Tests that the shipped lexicon table is used, without vaderSentiment,
+    and only once sentiment is first scored.
+    """
+    import os, pathlib, subprocess, sys
+    code = (
+        "import sys; from slithyt import cli, sentiment; "
+        "assert 'vaderSentiment' not in sys.modules; "
+        "assert sentiment._word_lexicon.cache_info().currsize == 0; "
+        "sentiment.analyze_word_sentiment('love'); "
+        "assert sentiment._word_lexicon.cache_info().currsize == 1"
+    )
+    src = str(pathlib.Path(sentiment.__file__).parents[1])
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": src})
+    lexicon = sentiment._word_lexicon()
+    assert len(lexicon) > 7000 and lexicon["love"] == 3.2
+
+def test_score_many_matches_single_word_scores(monkeypatch):
+    """
+    Tests that batch scoring, in-process or pooled, gives exactly the
+    per-word scores, for repeated words, mixed case and odd inputs too.
+    """
+    words = ["unhappiness", "Unhappiness", "disunhappy", "fearlessless", "necrotoxic", "love",
+             "benezyx", "zyxless", "", "prosperterrible", "mort\nphil", "amicable", "zyx",
+             "malvoluminous", "honorificable", "happiness", "vitalvital"] * 3
+    expected = [sentiment.analyze_word_sentiment(w) for w in words]
+    scores = sentiment.score_many(words)
+    assert scores.dtype == float and scores.tolist() == expected
+    monkeypatch.setattr(sentiment, "SCORE_CHUNK_SIZE", 4)
+    assert sentiment.score_many(iter(words), jobs=2).tolist() == expected
+    assert sentiment.score_many([]).shape == (0,)
+
+def test_guided_generation_mostly_meets_the_bounds():
+    """
+    Tests that constraining a model with guide_patterns() makes nearly every
+    generated word score within the requested sentiment bounds.
+    """
+    import numpy as np
+    from slithyt import generator, pattern, utils
+    model, _ = generator.train_from_corpus(utils.data_path("latin-male-names.txt"), n=3, compact=True)
+    compiled = generator.compile_model(model)
+    for low, high in [(0.8, None), (None, 0.2)]:
+        matches, rejects = sentiment.guide_patterns(low, high)
+        guided = pattern.constrain(compiled, matches, rejects)
+        words = generator.generate_batch(guided, 2000, 5, 10, rng=np.random.default_rng(0))
+        scores = sentiment.score_many(words)
+        ok = scores >= low if low is not None else scores <= high
+        assert ok.mean() > 0.95
+    assert sentiment.guide_patterns() is None
+    assert sentiment.guide_patterns(0.4, 0.6) is None
+    assert "mor" not in sentiment.guide_patterns(0.8)[1].split("|")  # inside "amor"
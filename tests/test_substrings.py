@@ -0,0 +1,25 @@
+"""Tests for slithyt.substrings."""
+
+import random
+
+from slithyt import substrings, validator
+
+
+def test_matcher_agrees_with_a_naive_scan():
+    blocked = ["she", "he", "hers", "his", "usher", "x", "ab"]
+    matcher = substrings.SubstringMatcher.build(blocked, min_len=2)
+    patterns = [b for b in blocked if len(b) >= 2]
+    rng = random.Random(0)
+    words = ["".join(rng.choice("abehirsux") for _ in range(rng.randint(1, 9))) for _ in range(2000)]
+    for word in words + ["ushers", "HIS", "x", ""]:
+        assert (word in matcher) == any(p in word.lower() for p in patterns)
+    assert matcher.find("pushers") == "she"
+    assert matcher.find("x") is None  # shorter than min_len
+
+
+def test_validate_word_rejects_blocked_substrings():
+    matcher = substrings.SubstringMatcher.build(["bad"])
+    assert not validator.validate_word("unbadly", blocked_substrings=matcher)
+    assert validator.validate_word("unbadly", blocklist_set={"bad"})
+    constraints = validator.Constraints(5, 10, blocked_substrings=matcher)
+    assert not constraints.validate("badger") and constraints.validate("goodly")
@@ -0,0 +1,64 @@
+"""Tests for slithyt.wordindex."""
+
+import pickle
+
+import pytest
+
+from slithyt import wordindex
+
+
+def test_index_file_matches_the_word_set(tmp_path):
+    words = {"slithy", "toves", "gyre", "gimble", "wabe", "brillig", "café"}
+    path = tmp_path / "words.idx"
+    wordindex.write(words, path)
+    index = wordindex.WordIndex.open(path)
+    assert len(index) == len(words)
+    assert list(index) == sorted(words, key=lambda w: w.encode("utf-8"))
+    for word in words:
+        assert word in index
+    for word in ("slith", "slithyy", "", "toves ", "cafe", None):
+        assert word not in index
+
+
+def test_streamed_write_spills_sorted_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(wordindex, "SORT_RUN_SIZE", 3)
+    words = ["toves", "slithy", "gyre", "toves", "brillig", "café", "gyre", "wabe", "a"]
+    path = tmp_path / "words.idx"
+    screen = wordindex.write(iter(words), path, filter_error_rate=0.01)
+    assert path.read_bytes() == wordindex.pack(words)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["words.idx"]  # runs cleaned up
+    assert len(screen) == 7 and all(word in screen for word in words)
+    assert wordindex.write([], tmp_path / "empty.idx") is None
+    assert len(wordindex.WordIndex.open(tmp_path / "empty.idx")) == 0
+
+
+def test_index_pickles_by_path_or_by_value(tmp_path):
+    path = tmp_path / "words.idx"
+    wordindex.write(["a", "b"], path)
+    mapped = pickle.loads(pickle.dumps(wordindex.WordIndex.open(path)))
+    assert mapped.path == str(path) and "b" in mapped
+    in_memory = pickle.loads(pickle.dumps(wordindex.WordIndex.from_words(["c"])))
+    assert list(in_memory) == ["c"]
+    assert len(wordindex.WordIndex.from_words([])) == 0
+
+
+def test_rejects_foreign_files(tmp_path):
+    path = tmp_path / "junk.idx"
+    path.write_bytes(b"not an index at all")
+    with pytest.raises(ValueError):
+        wordindex.WordIndex.open(path)
+
+
+def test_filtered_index_answers_exactly():
+    from slithyt import bloom
+
+    words = [f"word{i}" for i in range(2000)]
+    screen = bloom.BloomFilter(len(words), error_rate=0.2)  # plenty of false positives
+    for word in words:
+        screen.add(word)
+    filtered = wordindex.FilteredIndex(screen, wordindex.WordIndex.from_words(words))
+    probes = [f"other{i}" for i in range(2000)]
+    assert any(p in screen for p in probes)
+    assert not any(p in filtered for p in probes)
+    assert all(w in filtered for w in words)
+    assert len(filtered) == 2000 and set(filtered) == set(words)